@@ -0,0 +1,126 @@
+import math
+import time
+import numpy
+from keras.models import Model
+from keras.layers import Input, Dense, Lambda, Concatenate
+from keras.optimizers import SGD
+from keras import backend as K
+import tensorflow as tf
+import os
+
+from NeuralNetwork import NeuralNetwork
+from selector_config import raceName
+
+
+'''
+Agent and strategy selection in one model
+A shared trunk feeds an agent head, and the strategy head sees the trunk plus the agent the agent head picked,
+so choosing an agent and a strategy costs one forward pass and learning from a decision costs one training step
+
+The strategy head is conditioned on the agent through the agentChoice input:
+when it is all zeros (prediction) the argmax of the agent head is used, the same masked vector AgentSelector builds
+when it holds a one hot agent (training) that agent is used, the same as predAgent in AgentSelector.learn
+'''
+class FusedNeuralNetwork():
+    def __init__(self, nInputs, nAgents, nStrategies, depth, width, epochs, opponent_race, lr = .1):
+        self.nInputs = nInputs
+        self.nAgents = nAgents
+        self.nStrategies = nStrategies
+        self.epochs = epochs
+
+        # Incremented whenever the weights change so cached predictions can be dropped
+        self.version = 0
+
+        # Make models directory if it doesn't exist
+        if not os.path.exists("./models"):
+            os.mkdir("./models")
+
+        self.fileName = "./models/" + raceName(opponent_race) + "_fused_model_{0}{1}{2}{3}{4}".format(nInputs, nAgents, nStrategies, depth, width)
+
+        inputs = Input(shape=(nInputs,))
+        agentChoice = Input(shape=(nAgents,))
+        trunk = inputs
+        for i in range(depth):
+            trunk = Dense(math.floor(nInputs * width), activation='sigmoid', kernel_initializer='random_uniform')(trunk)
+        agent = Dense(nAgents, activation='sigmoid', kernel_initializer='random_uniform', name='agent')(trunk)
+        chosenAgent = Lambda(self.conditionOnAgent)([agent, agentChoice])
+        strategy = Dense(nStrategies, activation='sigmoid', kernel_initializer='random_uniform', name='strategy')(
+            Concatenate()([trunk, chosenAgent]))
+
+        self.model = Model(inputs=[inputs, agentChoice], outputs=[agent, strategy])
+        sgd = SGD(lr=lr)
+        self.model.compile(optimizer=sgd, loss='mean_squared_error')
+
+        # The default graph is per thread in TensorFlow, keep this one so the model also works from the decision worker thread
+        self.graph = tf.get_default_graph()
+
+    @staticmethod
+    def conditionOnAgent(tensors):
+        agent, agentChoice = tensors
+        # Keep only the highest agent output, gradients from the strategy loss do not flow back into the agent head
+        masked = K.stop_gradient(agent * K.cast(K.equal(agent, K.max(agent, axis=-1, keepdims=True)), K.floatx()))
+        hasChoice = K.max(agentChoice, axis=-1, keepdims=True)
+        return hasChoice * agentChoice + (1 - hasChoice) * masked
+
+    def train(self, inputs, chosenAgents, agentOutputs, strategyOutputs):
+        with self.graph.as_default():
+            self.model.fit([numpy.array(inputs), numpy.array(chosenAgents)], [numpy.array(agentOutputs), numpy.array(strategyOutputs)],
+                           epochs=self.epochs, verbose=0)
+        self.version += 1
+
+    # Returns the agent outputs and the strategy outputs, the strategy for chosenAgents when given instead of the best agent
+    def predict(self, inputs, chosenAgents = None):
+        inputs = numpy.array(inputs)
+        chosenAgents = numpy.zeros((len(inputs), self.nAgents)) if chosenAgents is None else numpy.array(chosenAgents)
+        with self.graph.as_default():
+            return self.model.predict([inputs, chosenAgents])
+
+    def saveWeights(self):
+        try:
+            with self.graph.as_default():
+                self.model.save_weights(self.fileName)
+        except:
+            print("failed to save weights")
+            pass
+
+    def loadWeights(self):
+        try:
+            with self.graph.as_default():
+                self.model.load_weights(self.fileName)
+            self.version += 1
+        except:
+            print("failed to load weights")
+            pass
+
+#Benchmark of one decision with the fused model against the agent and strategy network pair AgentSelector uses
+#A decision is one learn() and one selectNewAgentsAndStrategies(), inputs are the size of a game against protoss
+if __name__ == '__main__':
+    nInputs, nAgents, nStrategies, runs = 83, 4, 11, 50
+    agentNN = NeuralNetwork(nInputs + nAgents + nStrategies, nAgents, 1, 1, 100, 3, "benchmark_agent")
+    strategyNN = NeuralNetwork(nInputs + 2 * nAgents + nStrategies, nStrategies, 1, 1, 100, 3, "benchmark_strategy")
+    fusedNN = FusedNeuralNetwork(nInputs + nAgents + nStrategies, nAgents, nStrategies, 1, 1, 100, 3)
+
+    curInputs = numpy.random.rand(nInputs).tolist()
+    agent = [0, 1, 0, 0]
+    strategy = [0] * nStrategies
+    strategy[3] = 1
+    agentOutputs = [[0, 1, 0, 0]]
+    strategyOutputs = [strategy]
+
+    def pairDecision():
+        agentNN.train([curInputs + agent + strategy], agentOutputs)
+        strategyNN.train([curInputs + agent + agent + strategy], strategyOutputs)
+        nextAgent = agentNN.predict([curInputs + agent + strategy])[0].tolist()
+        nextAgent = [value if value == max(nextAgent) else 0 for value in nextAgent]
+        strategyNN.predict([curInputs + nextAgent + agent + strategy])
+
+    def fusedDecision():
+        fusedNN.train([curInputs + agent + strategy], [agent], agentOutputs, strategyOutputs)
+        fusedNN.predict([curInputs + agent + strategy])
+
+    for name, decision in (("agent + strategy networks", pairDecision), ("fused network", fusedDecision)):
+        decision()
+        start = time.perf_counter()
+        for _ in range(runs):
+            decision()
+        print("{}: {:0.2f}ms per decision".format(name, (time.perf_counter() - start) / runs * 1000))
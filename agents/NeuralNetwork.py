@@ -5,15 +5,19 @@ from keras.layers import Dense, Activation, Flatten
 from keras.optimizers import SGD
 from keras.callbacks import Callback
 from keras import backend as K
+import tensorflow as tf
 import os
 
 
 class NeuralNetwork():
-    def __init__(self, nInputs, nOutputs, depth, width, epochs, opponent_race, model_type):
+    def __init__(self, nInputs, nOutputs, depth, width, epochs, opponent_race, model_type, lr = .1):
         self.nInputs = nInputs
         self.nOutputs = nOutputs
         self.epochs = epochs
 
+        # Incremented whenever the weights change so cached predictions can be dropped
+        self.version = 0
+
         # Make logs directory if it doesn't exist
         if not os.path.exists("./models"):
             os.mkdir("./models")
@@ -31,25 +35,41 @@ class NeuralNetwork():
             self.model.add(Activation('sigmoid'))
         self.model.add(Dense(nOutputs, kernel_initializer='random_uniform'))
         self.model.add(Activation('sigmoid'))
-        sgd = SGD(lr=.1)
+        sgd = SGD(lr=lr)
         self.model.compile(optimizer=sgd, loss='mean_squared_error')
 
+        # The default graph is per thread in TensorFlow, keep this one so the model also works from the decision worker thread
+        self.graph = tf.get_default_graph()
+
     def train(self, inputs, outputs):
-        self.model.fit(numpy.array(inputs), numpy.array(outputs), epochs=self.epochs, verbose=0)
+        with self.graph.as_default():
+            self.model.fit(numpy.array(inputs), numpy.array(outputs), epochs=self.epochs, verbose=0)
+        self.version += 1
+
+    # Trains one pass over a large set of samples in minibatches, used for offline training on recorded games
+    def trainBatch(self, inputs, outputs, batchSize):
+        with self.graph.as_default():
+            history = self.model.fit(numpy.asarray(inputs), numpy.asarray(outputs), batch_size=batchSize, epochs=1, verbose=0)
+        self.version += 1
+        return history.history["loss"][-1]
 
     def predict(self, inputs):
-        return self.model.predict(numpy.array(inputs))
+        with self.graph.as_default():
+            return self.model.predict(numpy.array(inputs))
 
     def saveWeights(self):
         try:
-            self.model.save_weights(self.fileName)
+            with self.graph.as_default():
+                self.model.save_weights(self.fileName)
         except:
             print("failed to save weights")
             pass
 
     def loadWeights(self):
         try:
-            self.model.load_weights(self.fileName)
+            with self.graph.as_default():
+                self.model.load_weights(self.fileName)
+            self.version += 1
         except:
             print("failed to load weights")
             pass
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+import argparse
+import sys
+import time
+import numpy
+
+from decision_recorder import loadDecisionData, buildTrainingSets
+from hyperparameter_sweep import choiceAccuracy
+from offline_trainer import groupByRace, buildNetworks
+from selector_config import raceName
+
+# Largest mean absolute difference between the int8 and float32 outputs on recorded decisions
+OUTPUT_TOLERANCE = .01
+
+# Largest drop in choice accuracy on recorded decisions compared to the float32 network
+ACCURACY_TOLERANCE = .01
+
+# Fraction of recorded decisions where the int8 and float32 networks must choose the same agent or strategy
+MIN_ARGMAX_AGREEMENT = .99
+
+
+'''
+Int8 inference for a NeuralNetwork, for running many games per host on CPU
+Every Dense layer is stored as int8 weights with one scale per layer, inputs to each layer are quantized per sample,
+and the matrix products run as NumPy integer matmuls with int32 accumulation. Biases and the sigmoid stay in float32
+
+Training still happens on the wrapped float network, and the int8 weights are rebuilt after every change,
+so this can replace a NeuralNetwork anywhere AgentSelector uses one
+'''
+class QuantizedNeuralNetwork():
+    def __init__(self, network):
+        self.network = network
+        self.fileName = network.fileName
+        self.layers = []
+        self.quantize()
+
+    '''
+    Converts the Dense layers of the float network into (int8 weights, weight scale, float32 bias)
+    '''
+    def quantize(self):
+        self.layers = []
+        for layer in self.network.model.layers:
+            layerType = type(layer).__name__
+            if layerType == "Dense":
+                with self.network.graph.as_default():
+                    weights, bias = layer.get_weights()
+                scale = max(float(numpy.max(numpy.abs(weights))), 1e-8) / 127
+                quantized = numpy.round(weights / scale).astype(numpy.int8)
+                self.layers.append((quantized, numpy.float32(scale), bias.astype(numpy.float32)))
+            elif layerType == "Activation":
+                if layer.get_config()["activation"] != "sigmoid":
+                    raise ValueError("Only sigmoid activations can be quantized, got " + layer.get_config()["activation"])
+            else:
+                raise ValueError("Cannot quantize layer " + layerType)
+
+    @property
+    def version(self):
+        return self.network.version
+
+    def predict(self, inputs):
+        values = numpy.asarray(inputs, dtype=numpy.float32)
+        for weights, weightScale, bias in self.layers:
+            inputScale = numpy.maximum(numpy.max(numpy.abs(values), axis=1, keepdims=True), 1e-8) / 127
+            quantizedValues = numpy.round(values / inputScale).astype(numpy.int8)
+            accumulated = numpy.matmul(quantizedValues, weights, dtype=numpy.int32)
+            values = accumulated * (inputScale * weightScale) + bias
+            values = 1 / (1 + numpy.exp(-values))
+        return values
+
+    def train(self, inputs, outputs):
+        self.network.train(inputs, outputs)
+        self.quantize()
+
+    def saveWeights(self):
+        self.network.saveWeights()
+
+    def loadWeights(self):
+        self.network.loadWeights()
+        self.quantize()
+
+    '''
+    Returns the bytes used by the float32 weights and by the int8 weights with their scales
+    '''
+    def memoryFootprint(self):
+        floatBytes = 0
+        quantizedBytes = 0
+        for weights, weightScale, bias in self.layers:
+            floatBytes += weights.size * 4 + bias.nbytes
+            quantizedBytes += weights.nbytes + weightScale.nbytes + bias.nbytes
+        return floatBytes, quantizedBytes
+
+    '''
+    Compares int8 inference against the float network on the given samples
+    chosen and correct are the recorded choices and outcomes used for the choice accuracy
+    '''
+    def compare(self, inputs, chosen, correct, runs = 50):
+        floatOutputs = self.network.predict(inputs)
+        quantizedOutputs = self.predict(inputs)
+
+        sample = inputs[:1]
+        start = time.perf_counter()
+        for _ in range(runs):
+            self.network.predict(sample)
+        floatLatency = (time.perf_counter() - start) / runs
+        start = time.perf_counter()
+        for _ in range(runs):
+            self.predict(sample)
+        quantizedLatency = (time.perf_counter() - start) / runs
+
+        floatBytes, quantizedBytes = self.memoryFootprint()
+        return {
+            "meanAbsError": float(numpy.mean(numpy.abs(floatOutputs - quantizedOutputs))),
+            "maxAbsError": float(numpy.max(numpy.abs(floatOutputs - quantizedOutputs))),
+            "argmaxAgreement": float(numpy.mean(numpy.argmax(floatOutputs, axis=1) == numpy.argmax(quantizedOutputs, axis=1))),
+            "floatAccuracy": choiceAccuracy(floatOutputs, chosen, correct),
+            "quantizedAccuracy": choiceAccuracy(quantizedOutputs, chosen, correct),
+            "floatLatency": floatLatency,
+            "quantizedLatency": quantizedLatency,
+            "floatBytes": floatBytes,
+            "quantizedBytes": quantizedBytes
+        }
+
+'''
+Returns true if a comparison is within the stated tolerances
+'''
+def withinTolerance(report):
+    return report["meanAbsError"] <= OUTPUT_TOLERANCE and report["argmaxAgreement"] >= MIN_ARGMAX_AGREEMENT and \
+        report["floatAccuracy"] - report["quantizedAccuracy"] <= ACCURACY_TOLERANCE
+
+#Checks the int8 networks against the saved float32 networks on recorded decisions for every race in the given files
+#Example: python3 QuantizedNeuralNetwork.py decisions/*.dec
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compares int8 and float32 inference of the saved networks on recorded decisions")
+    parser.add_argument("datasets", nargs="+", help="Recorded decision files, any opponent race")
+    args = parser.parse_args()
+
+    passed = True
+    groups, schemas = groupByRace(args.datasets)
+    for opponent_race, paths in groups.items():
+        trainingSets = buildTrainingSets(loadDecisionData(paths))
+        for model_type, network in buildNetworks(opponent_race, *schemas[opponent_race]).items():
+            network.loadWeights()
+            inputs, _, chosen, correct = trainingSets[model_type]
+            report = QuantizedNeuralNetwork(network).compare(inputs, chosen, correct)
+            ok = withinTolerance(report)
+            passed = passed and ok
+            print("### {} {} network on {} decisions: {}".format(raceName(opponent_race), model_type, len(inputs), "PASS" if ok else "FAIL"))
+            print("weights {} -> {} bytes, latency {:0.3f}ms -> {:0.3f}ms".format(
+                report["floatBytes"], report["quantizedBytes"], report["floatLatency"] * 1000, report["quantizedLatency"] * 1000))
+            print("mean abs error {:0.4f} (max {:0.4f}), argmax agreement {:0.2%}, accuracy {:0.3f} -> {:0.3f}".format(
+                report["meanAbsError"], report["maxAbsError"], report["argmaxAgreement"], report["floatAccuracy"], report["quantizedAccuracy"]))
+    sys.exit(0 if passed else 1)
@@ -8,6 +8,7 @@ import os
 import argparse
 import random
 import signal
+import time
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 import numpy as np
@@ -26,7 +27,16 @@ from zerglingBanelingRush_agent import ZerglingBanelingRushAgent
 from mutalisk_agent import MutaliskAgent
 from dumbagent import DumbAgent
 from NeuralNetwork import NeuralNetwork
+from FusedNeuralNetwork import FusedNeuralNetwork
+from QuantizedNeuralNetwork import QuantizedNeuralNetwork
 from strategies import Strategies
+from selector_config import loadNetworkConfig
+from decision_recorder import DecisionRecorder, decisionFileName
+from prediction_cache import PredictionCache
+from decision_worker import DecisionWorker, StepLatency
+from decision_scheduler import DecisionScheduler
+from enemy_memory import EnemyMemory
+from pixel_map import pixel_map_values
 
 
 # Coloring for terminal output
@@ -43,11 +53,44 @@ class bcolors:
 
 
 class AgentSelector(LoserAgent):
-    #TODO Implement previous known enemy list so that we dont lose info over time
-    def __init__(self, is_logging = False, is_printing_to_console = False, isMainAgent = False):
-        super().__init__(is_logging, is_printing_to_console, isMainAgent, "AgentSelector_")
+    def __init__(self, is_logging = False, is_printing_to_console = False, isMainAgent = False, is_recording = False, use_fused_model = False,
+                 use_quantized_model = False, is_learning_online = True,
+                 is_offloading_decisions = True, is_adaptive_interval = True, step_budget = 30,
+                 build_frame_skip = 1, use_resource_ledger = True, enemy_memory_seconds = 60):
+        super().__init__(is_logging, is_printing_to_console, isMainAgent, "AgentSelector_", step_budget, build_frame_skip,
+                         use_resource_ledger)
         print(bcolors.OKGREEN + "###AgentSelector Constructor" + bcolors.ENDC)
 
+        # Setting this to true writes every decision step to a file in the agents/decisions directory for offline training
+        self.is_recording = is_recording
+
+        # Setting this to true selects agent and strategy with one FusedNeuralNetwork instead of two NeuralNetworks
+        self.use_fused_model = use_fused_model
+
+        # Setting this to true runs the agent and strategy networks with int8 weights, training still happens in float32
+        # There is no int8 version of the fused network
+        if use_fused_model and use_quantized_model:
+            raise ValueError("The fused network cannot be quantized")
+        self.use_quantized_model = use_quantized_model
+
+        # Setting this to false keeps the loaded weights for the whole game, use it with pretrained networks
+        # While learning online the weights change before every selection, so the prediction cache never hits
+        self.is_learning_online = is_learning_online
+        self.predictionCache = PredictionCache()
+
+        # Setting this to true trains and predicts on a worker thread and applies the decision on a later step,
+        # the current agent keeps playing with its current strategy in the meantime
+        self.is_offloading_decisions = is_offloading_decisions
+        self.decisionWorker = DecisionWorker()
+        self.stepLatency = StepLatency()
+
+        # Setting this to true decides when the game changes and less often when it is stable, instead of every 100 steps
+        self.decisionScheduler = DecisionScheduler(is_adaptive_interval)
+
+        # Enemy units seen this game, including those now in the fog, for the inputs and the fitness
+        # Units not seen for enemy_memory_seconds are forgotten
+        self.enemyMemory = EnemyMemory(int(enemy_memory_seconds * 22.4))
+
         # List of build orders
         self.agents = [MutaliskAgent(), ZerglingBanelingRushAgent(), SafeRoachAgent(), DumbAgent()]
         self.nAgents = len(self.agents)
@@ -67,12 +110,10 @@ class AgentSelector(LoserAgent):
         self.chooseRandomStrategy()
 
         # Properties
-        self.stepsPerAgent = 100
         self.curAgentIndex = 0
         self.strategiesIndex = 0
         self.curStep = 0
         self.timesSwitched = 0
-        self.last_known_enemies = None
         self.correctChoice = 0
 
         ''' Variables initialized by setupInputs() when game starts'''
@@ -80,6 +121,8 @@ class AgentSelector(LoserAgent):
         self.prevInputs = []
         self.agentNN = None
         self.strategyNN = None
+        self.fusedNN = None
+        self.recorder = None
 
         self.prevAgent = 0
         self.prevStrategy = 0
@@ -235,36 +278,37 @@ class AgentSelector(LoserAgent):
         return unit_breakdown, special_units, ignored_units, defensive_buildings, production_buildings, upgrade_buildings, technology_buildings, remaining_basic_buildings, \
             remaining_advanced_buildings, other_buildings, army_breakdown, workers, fitness_ignored
 
+    '''
+    Number of units of each name, our units or the enemy units remembered by enemyMemory
+    '''
+    def unit_counts(self, owned):
+        if owned:
+            counts = defaultdict(int)
+            for unit in self.mainAgent.units:
+                counts[unit.name] += 1
+            return counts
+        return self.enemyMemory.counts()
+
     '''
     Creates the actual counts of units known at the time for either self or enemy.
     '''
     def unit_breakdown(self, owned, player_race):
         unit_breakdown, special_units, ignored_units, defensive_buildings, production_buildings, upgrade_buildings, technology_buildings, remaining_basic_buildings, \
             remaining_advanced_buildings, other_buildings, army_breakdown, workers, fitness_ignored = self.unit_setter(player_race)
-        if owned:
-            player = self.mainAgent.units
-        else:
-            # player = self.mainAgent.known_enemy_units
-            if len(self.mainAgent.known_enemy_units) != 0:
-                player = self.mainAgent.known_enemy_units
-                self.last_known_enemies = player #Update last known last_known_enemies
-            elif self.last_known_enemies != None:
-                player = self.last_known_enemies
-            else:
-                player = self.mainAgent.known_enemy_units
+        player = self.unit_counts(owned)
 
-        for unit in player:
-            if unit.name in ignored_units:
+        for name, count in player.items():
+            if name in ignored_units:
                 continue
             try:
-                unit_breakdown[unit.name] += 1
+                unit_breakdown[name] += count
             except KeyError:
                 try:
-                    unit_breakdown[special_units[unit.name]] += 1
+                    unit_breakdown[special_units[name]] += count
                 except KeyError:
-                    self.log("Names not covered: {0}".format(str(unit.name)))
+                    self.log("Names not covered: {0}".format(str(name)))
                     self.log("Known enemy list: {}".format(str(self.mainAgent.known_enemy_units)))
-                    unit_breakdown['rest'] += 1
+                    unit_breakdown['rest'] += count
         # return unit_breakdown -> only use for debugging if you want to see what the values look like
         return [unit_breakdown[key] for key in unit_breakdown]
 
@@ -312,42 +356,32 @@ class AgentSelector(LoserAgent):
     def fitness_breakdown(self, owned, player_race):
         unit_breakdown, special_units, ignored_units, defensive_buildings, production_buildings, upgrade_buildings, technology_buildings, remaining_basic_buildings, \
             remaining_advanced_buildings, other_buildings, army_breakdown, workers, fitness_ignored = self.unit_setter(player_race)
-        if owned:
-            player = self.mainAgent.units
-        else:
-            # player = self.mainAgent.known_enemy_units
-            if len(self.mainAgent.known_enemy_units) != 0:
-                player = self.mainAgent.known_enemy_units
-                self.last_known_enemies = player #Update last known last_known_enemies
-            elif self.last_known_enemies != None:
-                player = self.last_known_enemies
-            else:
-                player = self.mainAgent.known_enemy_units
+        player = self.unit_counts(owned)
 
-        for unit in player:
+        for name, count in player.items():
             try:
-                if unit.name in fitness_ignored:
+                if name in fitness_ignored:
                     continue
-                elif unit.name in defensive_buildings:
-                    defensive_buildings[unit.name] += 4
-                elif unit.name in production_buildings:
-                    production_buildings[unit.name] += 2
-                elif unit.name in upgrade_buildings:
-                    upgrade_buildings[unit.name] += 2
-                elif unit.name in technology_buildings:
-                    technology_buildings[unit.name] += 3
-                elif unit.name in remaining_basic_buildings:
-                    remaining_basic_buildings[unit.name] += 1
-                elif unit.name in remaining_advanced_buildings:
-                    remaining_advanced_buildings[unit.name] += 2
-                elif unit.name in other_buildings:
-                    other_buildings[unit.name] += 3
-                elif unit.name in army_breakdown:
-                    army_breakdown[unit.name] += 1
+                elif name in defensive_buildings:
+                    defensive_buildings[name] += 4 * count
+                elif name in production_buildings:
+                    production_buildings[name] += 2 * count
+                elif name in upgrade_buildings:
+                    upgrade_buildings[name] += 2 * count
+                elif name in technology_buildings:
+                    technology_buildings[name] += 3 * count
+                elif name in remaining_basic_buildings:
+                    remaining_basic_buildings[name] += count
+                elif name in remaining_advanced_buildings:
+                    remaining_advanced_buildings[name] += 2 * count
+                elif name in other_buildings:
+                    other_buildings[name] += 3 * count
+                elif name in army_breakdown:
+                    army_breakdown[name] += count
                 else:
-                    workers[unit.name] += 1
+                    workers[name] += count
             except KeyError:
-                self.log("Fitness names not covered: {0}".format(str(unit.name)))
+                self.log("Fitness names not covered: {0}".format(str(name)))
         fitness_breakdown = {
             **defensive_buildings, **production_buildings, **upgrade_buildings, **technology_buildings, **remaining_basic_buildings, \
             **remaining_advanced_buildings, **other_buildings, **army_breakdown, **workers
@@ -365,21 +399,41 @@ class AgentSelector(LoserAgent):
         print(bcolors.FAIL + "###Interrupt Received" + bcolors.ENDC)
 
     async def on_step(self, iteration):
+        stepStart = time.perf_counter()
+
+        # Army data is cached once per step
+        self.is_army_cached = False
+
         # Run first time setup
         if (iteration == 0):
             self.setupInputs()
             # Setup signal handler
             signal.signal(signal.SIGINT, self.signal_handler)
 
-        # Run fitness on a certain number of steps
-        if (iteration % self.stepsPerAgent == 0):
+        # Remember the enemy units seen this step, forget the ones that died or left
+        state = self.mainAgent.state
+        # Older python-sc2 has no GameState.dead_units, the tags are then read from the event of the raw observation
+        deadTags = getattr(state, "dead_units", None)
+        if deadTags is None:
+            rawData = getattr(getattr(state, "observation", None), "raw_data", None)
+            deadTags = rawData.event.dead_units if rawData is not None and rawData.HasField("event") else ()
+        self.enemyMemory.update(self.mainAgent.known_enemy_units, state.game_loop, deadTags,
+                                pixel_map_values(state.visibility))
+
+        # Switch to the agent and strategy of a decision that finished on the worker thread
+        if self.decisionWorker.isReady():
+            self.applyDecision(*self.decisionWorker.result())
+
+        # Run fitness when the scheduler asks for a decision, after the previous one has finished
+        isDecisionStep = not self.decisionWorker.isBusy() and self.decisionScheduler.isDecisionStep(iteration, self.observeChanges)
+        if isDecisionStep:
             # self.log("Flying: {0} Buildings: {1} Workers: {2}".format(str(flying_army), str(buildings), str(workers)))
             # In case you want to check my work, these are some helpful print statements
             # print(bcolors.OKGREEN + "Self units: %s" % str(self.mainAgent.units))
             # print(bcolors.OKGREEN + "Length of inputs: %s" % str(len(self.create_inputs())))
             # print(bcolors.OKBLUE + "Inputs: {} ".format(self.create_inputs()))
             # print(bcolors.OKGREEN + "Ownded units breakdown: %s" % str(self.owned_units()))
-            # print(bcolors.OKBLUE + "Enemies: {} ".format(self.last_known_enemies))
+            # print(bcolors.OKBLUE + "Enemies: {} ".format(self.enemyMemory.counts()))
             # print(bcolors.OKGREEN + "Fitness breakdown: {} ".format(self.fitness_breakdown(True, 2)))
             print(bcolors.OKBLUE + "Total: {}, Idle: {}, Mineral: {}, Vespene: {}, Other: {}".format(self.total_worker_count(), self.idle_worker_count(), self.mineral_worker_count(), self.vespene_worker_count(), self.remaining_worker_count()) + bcolors.ENDC)
             # print(bcolors.OKGREEN + "###Fitness function: {}".format(iteration) + bcolors.ENDC)
@@ -388,12 +442,37 @@ class AgentSelector(LoserAgent):
             self.checkFitness(iteration)
 
             print(bcolors.WARNING + "### Selecting new Agent and Strategy" + bcolors.ENDC)
-            self.learn()
-            self.selectNewAgentsAndStrategies()
+            self.recordDecision(iteration)
+            curInputs = self.mainAgent.create_inputs()
+            if self.is_offloading_decisions:
+                self.decisionWorker.submit(self.decide, curInputs)
+            else:
+                self.applyDecision(*self.decide(curInputs))
 
         # Call the current agent on_step
         await self.agents[self.curAgentIndex].on_step(iteration, self.strategiesIndex)
 
+        self.stepLatency.record(time.perf_counter() - stepStart, isDecisionStep)
+
+    '''
+    Learns from the last decision and chooses the next agent and strategy
+    Runs on the decision worker thread, so it only reads the game state passed in and does not change the current choice
+    '''
+    def decide(self, curInputs):
+        start = time.perf_counter()
+        if self.is_learning_online:
+            self.learn()
+        nextAgentIndex, nextStrategyIndex = self.selectNewAgentsAndStrategies(curInputs)
+        self.decisionScheduler.addNetworkTime(time.perf_counter() - start)
+        return curInputs, nextAgentIndex, nextStrategyIndex
+
+    # What the decision scheduler's change detectors compare between steps, counts that are already kept so a check
+    # costs no unit breakdown, the full fitness is only computed on decision steps
+    # The unit balance, our units and structures less the remembered enemy units, stands in for the fitness
+    def observeChanges(self):
+        enemies = len(self.enemyMemory)
+        return self.mainAgent.units.amount - enemies, enemies, self.mainAgent.army.amount
+
     def checkFitness(self, iteration):
         # Retrieve fitness score
         curFitness = self.fitness()
@@ -430,20 +509,44 @@ class AgentSelector(LoserAgent):
         self.nInputs = len(curInputs)
         self.prevInputs = [0] * self.nInputs
 
+        # Depth, width, epochs and learning rate come from the config written by hyperparameter_sweep.py
+        opponent_race = self.mainAgent.game_info.player_races[2]
+        if self.use_fused_model:
+            # inputs = nData inputs + nAgents (for last agent selected) + nStrategies (for last strategy selected)
+            # outputs = nAgents and nStrategies
+            fusedConfig = loadNetworkConfig(opponent_race, "fused")
+            self.fusedNN = FusedNeuralNetwork(self.nInputs + self.nAgents + self.nStrategies, self.nAgents, self.nStrategies, fusedConfig["depth"],
+                                              fusedConfig["width"], fusedConfig["epochs"], opponent_race, fusedConfig["lr"])
+            self.fusedNN.loadWeights()
+        else:
+            self.setupSeparateNetworks(opponent_race)
+
+        if self.is_recording:
+            self.recorder = DecisionRecorder(decisionFileName(opponent_race), self.nInputs, self.nAgents, self.nStrategies, opponent_race)
+            print(bcolors.OKBLUE + "### Recording decisions to " + self.recorder.fileName + bcolors.ENDC)
+        print(bcolors.OKBLUE + "### One time neural input setup" + bcolors.ENDC)
+        print(bcolors.OKBLUE + "### Enemy is " + str(self.mainAgent.game_info.player_races[2]) + bcolors.ENDC)
+
+
+    def setupSeparateNetworks(self, opponent_race):
         # inputs = nData inputs + nAgents (for last agent selected) + nStrategies (for last strategy selected)
         # outputs = nAgents
-        opponent_race = self.mainAgent.game_info.player_races[2]
-        self.agentNN = NeuralNetwork(self.nInputs + self.nAgents + self.nStrategies, self.nAgents, 1, 1, 100, opponent_race, "agent")
+        agentConfig = loadNetworkConfig(opponent_race, "agent")
+        self.agentNN = NeuralNetwork(self.nInputs + self.nAgents + self.nStrategies, self.nAgents, agentConfig["depth"],
+                                     agentConfig["width"], agentConfig["epochs"], opponent_race, "agent", agentConfig["lr"])
 
         self.agentNN.loadWeights()
 
         # inputs = nData inputs + 2 * nAgents (for last and current agent selected) + nStrategies (for last strategy selected)
         # outputs = nStrategies
-        self.strategyNN = NeuralNetwork(self.nInputs + 2 * self.nAgents + self.nStrategies, self.nStrategies, 1, 1, 100, opponent_race, "strategy")
+        strategyConfig = loadNetworkConfig(opponent_race, "strategy")
+        self.strategyNN = NeuralNetwork(self.nInputs + 2 * self.nAgents + self.nStrategies, self.nStrategies, strategyConfig["depth"],
+                                        strategyConfig["width"], strategyConfig["epochs"], opponent_race, "strategy", strategyConfig["lr"])
         self.strategyNN.loadWeights()
-        print(bcolors.OKBLUE + "### One time neural input setup" + bcolors.ENDC)
-        print(bcolors.OKBLUE + "### Enemy is " + str(self.mainAgent.game_info.player_races[2]) + bcolors.ENDC)
 
+        if self.use_quantized_model:
+            self.agentNN = QuantizedNeuralNetwork(self.agentNN)
+            self.strategyNN = QuantizedNeuralNetwork(self.strategyNN)
 
     def learn(self):
         #create list for all the inputs to the neural network
@@ -474,13 +577,57 @@ class AgentSelector(LoserAgent):
         strategyOutputList = [curStrategy]
         # self.log("Training agentNN with inputs: {0} and outputs {1}".format(str(agentInputList), str(agentOutputList)))
         # self.log("Training strategyNN with inputs: {0} and outputs {1}".format(str(strategyInputList), str(strategyOutputList)))
+        if self.fusedNN is not None:
+            # The fused network takes the chosen agent separately instead of a second copy of the inputs
+            self.fusedNN.train(agentInputList, [predAgent], agentOutputList, strategyOutputList)
+            return
         self.agentNN.train(agentInputList, agentOutputList)
         self.strategyNN.train(strategyInputList, strategyOutputList)
 
-    def selectNewAgentsAndStrategies(self):
-        #define other inputs to NN
-        curInputs = self.mainAgent.create_inputs()
-
+    '''
+    Saves the decision that learn() just trained on so it can be replayed offline
+    The first call of a game has no previous decision to record
+    '''
+    def recordDecision(self, iteration):
+        if self.recorder is None or iteration == 0:
+            return
+        self.recorder.record(iteration, self.prevInputs, self.prevAgent, self.prevStrategy, self.curAgentIndex,
+                             self.strategiesIndex, self.correctChoice)
+
+    async def on_end(self, game_result):
+        await super().on_end(game_result)
+        self.decisionWorker.shutdown()
+        if self.recorder is not None:
+            self.recorder.close()
+
+        metrics = self.predictionCache.metrics()
+        message = "### Prediction cache: {} hits, {} misses ({:0.1%} hit rate), {} invalidations, {:0.1f}ms inference saved".format(
+            metrics["hits"], metrics["misses"], metrics["hitRate"], metrics["invalidations"], metrics["savedTime"] * 1000)
+        print(bcolors.OKBLUE + message + bcolors.ENDC)
+        self.log(message)
+
+        message = "### Decisions: " + self.decisionScheduler.report()
+        print(bcolors.OKBLUE + message + bcolors.ENDC)
+        self.log(message)
+
+        message = "### Step latency: " + self.stepLatency.report()
+        print(bcolors.OKBLUE + message + bcolors.ENDC)
+        self.log(message)
+
+        if self.recorder is not None:
+            # Recording is meant to cost under 1% of the step time
+            message = "### Recording: {} decisions in {:0.2f}ms, {:0.3%} of the {:0.0f}ms spent in on_step".format(
+                self.recorder.nRows, self.recorder.time * 1000, self.recorder.time / max(self.stepLatency.total, 1e-9),
+                self.stepLatency.total * 1000)
+            print(bcolors.OKBLUE + message + bcolors.ENDC)
+            self.log(message)
+
+        message = "### Enemy memory: " + self.enemyMemory.report()
+        print(bcolors.OKBLUE + message + bcolors.ENDC)
+        self.log(message)
+
+    # Returns the index of the next agent and the next strategy
+    def selectNewAgentsAndStrategies(self, curInputs):
         #create list for all the inputs to the neural network
         curAgent = [0] * self.nAgents
         curStrategy = [0] * self.nStrategies
@@ -489,28 +636,27 @@ class AgentSelector(LoserAgent):
         curAgent[self.curAgentIndex] = 1
         curStrategy[self.strategiesIndex] = 1
 
-        #appends all the input lists together, also puts them into lists of lists for the NN
-        # ie [1, 2, 3] + [4, 5] => [[1, 2, 3, 4 ,5]]
-        agentInputList = [curInputs + curAgent + curStrategy]
-        # print(bcolors.WARNING + "###agentInputList: {}".format(agentInputList) + bcolors.ENDC)
-        # self.log("Predicting agentNN with inputs: {0}".format(str(agentInputList)))
+        # Networks that have not changed since the same inputs were seen give the same outputs
+        key = self.predictionCache.key(curInputs, self.curAgentIndex, self.strategiesIndex)
+        nextAgent, nextStrategy = self.predictionCache.get(key, self.networkVersion(),
+                                                          lambda: self.predictNext(curInputs, curAgent, curStrategy))
 
-        nextAgent = self.agentNN.predict(agentInputList)[0].tolist() #extract first row from returned numpy array
-        nextAgentIndex = nextAgent.index(max(nextAgent))
-        nextAgent = [nextAgent[i] if i == nextAgentIndex else 0 for i in range(len(nextAgent))]
+        # Weights only change while learning online
+        if self.is_learning_online:
+            if self.fusedNN is not None:
+                self.fusedNN.saveWeights()
+            else:
+                self.agentNN.saveWeights()
+                self.strategyNN.saveWeights()
 
-        strategyInputList = [curInputs + nextAgent + curAgent + curStrategy]
-        # self.log("Predicting strategyNN with inputs: {0}".format(str(strategyInputList)))
-        nextStrategy = self.strategyNN.predict(strategyInputList)[0].tolist() #extract first row from returned numpy array
+        return nextAgent.index(max(nextAgent)), nextStrategy.index(max(nextStrategy))
 
+    def applyDecision(self, curInputs, nextAgentIndex, nextStrategyIndex):
         self.prevAgent = self.curAgentIndex
         self.prevStrategy = self.strategiesIndex
         self.prevInputs = curInputs
         self.curAgentIndex = nextAgentIndex
-        self.strategiesIndex = nextStrategy.index(max(nextStrategy))
-
-        self.agentNN.saveWeights()
-        self.strategyNN.saveWeights()
+        self.strategiesIndex = nextStrategyIndex
 
         # Add to agent frequency
         agentName = str(self.agents[self.curAgentIndex]).split(".")[1].split(" ")[0]
@@ -520,6 +666,36 @@ class AgentSelector(LoserAgent):
         strategyname = str(self.strategies(self.strategiesIndex)).split(".")[1]
         stratFreq[strategyname] += 1
 
+    '''
+    Returns the agent and strategy outputs for the current inputs and the previous agent and strategy one hots
+    '''
+    def predictNext(self, curInputs, curAgent, curStrategy):
+        #appends all the input lists together, also puts them into lists of lists for the NN
+        # ie [1, 2, 3] + [4, 5] => [[1, 2, 3, 4 ,5]]
+        agentInputList = [curInputs + curAgent + curStrategy]
+        # print(bcolors.WARNING + "###agentInputList: {}".format(agentInputList) + bcolors.ENDC)
+        # self.log("Predicting agentNN with inputs: {0}".format(str(agentInputList)))
+
+        if self.fusedNN is not None:
+            # One forward pass, the strategy head is conditioned on the chosen agent inside the model
+            nextAgent, nextStrategy = self.fusedNN.predict(agentInputList)
+            return nextAgent[0].tolist(), nextStrategy[0].tolist()
+
+        nextAgent = self.agentNN.predict(agentInputList)[0].tolist() #extract first row from returned numpy array
+        nextAgentIndex = nextAgent.index(max(nextAgent))
+        nextAgent = [nextAgent[i] if i == nextAgentIndex else 0 for i in range(len(nextAgent))]
+
+        strategyInputList = [curInputs + nextAgent + curAgent + curStrategy]
+        # self.log("Predicting strategyNN with inputs: {0}".format(str(strategyInputList)))
+        nextStrategy = self.strategyNN.predict(strategyInputList)[0].tolist() #extract first row from returned numpy array
+        return nextAgent, nextStrategy
+
+    # Changes whenever any of the networks in use is trained or loads weights
+    def networkVersion(self):
+        if self.fusedNN is not None:
+            return self.fusedNN.version
+        return self.agentNN.version, self.strategyNN.version
+
 """
 Parse command line arguments
 List options: python3 agent_selector.py -h
@@ -539,7 +715,50 @@ def readArguments():
     # Number
     parser.add_argument("-n", "--number", help="Number of games the bot will play", type=int)
 
-    return parser.parse_args()
+    # Map
+    parser.add_argument("-m", "--map", help="Map to play on, its analysis is cached in agents/maps", type=str, default="Abyssal Reef LE")
+
+    # Record decisions
+    parser.add_argument("--record", help="Record every decision step to agents/decisions for offline training", action="store_true")
+
+    # Fused model
+    parser.add_argument("--fused", help="Select agent and strategy with one fused network instead of two", action="store_true")
+
+    # Quantized model
+    parser.add_argument("--quantized", help="Run the agent and strategy networks with int8 weights, not with --fused",
+                        action="store_true")
+
+    # Online learning
+    parser.add_argument("--no-online-learning", help="Keep the loaded weights for the whole game instead of training after every decision",
+                        action="store_true")
+
+    # Blocking decisions
+    parser.add_argument("--blocking-decisions", help="Train and predict on the game loop instead of a worker thread", action="store_true")
+
+    # Fixed decision interval
+    parser.add_argument("--fixed-interval", help="Choose a new agent and strategy every 100 steps instead of when the game changes",
+                        action="store_true")
+
+    # Step budget
+    parser.add_argument("--step-budget", help="Milliseconds per step for the agent's tasks before lower priority ones are deferred",
+                        type=int, default=30)
+
+    # Build frame skip
+    parser.add_argument("--build-skip", help="Run economy and build order logic every this many game loops, micro still runs every step",
+                        type=int, default=1)
+
+    # Resource ledger
+    parser.add_argument("--no-ledger", help="Let every command of a step check the observed resources instead of what is left of them",
+                        action="store_true")
+
+    # Enemy memory
+    parser.add_argument("--enemy-memory", help="Seconds an enemy unit that went into the fog is still counted in the inputs and fitness",
+                        type=float, default=60)
+
+    args = parser.parse_args()
+    if args.fused and args.quantized:
+        parser.error("--quantized only applies to the separate agent and strategy networks, not to --fused")
+    return args
 
 def checkNParseArgs(args):
     # Race
@@ -1167,8 +1386,10 @@ def main():
         print(bcolors.OKGREEN + "###Opponent is " + bcolors.FAIL + "{}: {}".format(enemyRace, enemyRaceList.index(enemyRace)) + bcolors.ENDC)
 
         # Start game with AgentSelector as the Bot, and begin logging
-        result = sc2.run_game(sc2.maps.get("Abyssal Reef LE"), [
-            Bot(Race.Zerg, AgentSelector(True, True, True)),
+        result = sc2.run_game(sc2.maps.get(args.map), [
+            Bot(Race.Zerg, AgentSelector(True, True, True, args.record, args.fused, args.quantized, not args.no_online_learning,
+                                         not args.blocking_decisions, not args.fixed_interval, args.step_budget,
+                                         args.build_skip, not args.no_ledger, args.enemy_memory)),
             # If you change the opponent race remember to change nInputs in the __init__ as well
             Computer(enemyRace, difficulty)
         ], realtime=False)
@@ -0,0 +1,278 @@
+from bisect import insort
+
+from sc2.constants import *
+
+
+'''
+Declarative build orders for the agents
+A build order is a list of BuildStep in priority order. BuildOrder compiles it into a state machine: a step becomes
+active once every step named in its after list is complete, and leaves the active set when it completes or when a
+step named in its until list completes. Each frame only the active steps are evaluated, so the cost per frame is the
+number of active steps instead of every rule of the build
+'''
+
+
+'''
+One step of a build order
+action: what the step does, one of Train, Build, BuildExtractor, UseAbility or Call below
+after: names of steps that must be complete before this step becomes active
+until: names of steps whose completion retires this step
+supply: smallest supply used that triggers the step
+time: smallest game time in seconds that triggers the step
+requires: unit types that must exist and be ready
+when: extra trigger, a function of the agent
+count: the step is complete after its action succeeded this many times, None repeats it for the rest of the game
+target: a number of units, or a function of the agent returning one. The step fires while the units of the action's
+        type plus the ones pending are below it and is never complete, so lost units and buildings are replaced
+'''
+class BuildStep():
+    def __init__(self, name, action, after = (), until = (), supply = 0, time = 0, requires = (), when = None,
+                 count = 1, target = None):
+        self.name = name
+        self.action = action
+        self.after = list(after)
+        self.until = list(until)
+        self.supply = supply
+        self.time = time
+        self.requires = list(requires)
+        self.when = when
+        self.count = None if target is not None else count
+        self.target = target
+
+    def is_triggered(self, agent):
+        if agent.supply_used < self.supply or agent.game_time < self.time:
+            return False
+        for unit_type in self.requires:
+            if not agent.units(unit_type).ready.exists:
+                return False
+        if self.target is not None:
+            target = self.target(agent) if callable(self.target) else self.target
+            if agent.units(self.action.unit_type).amount + agent.already_pending(self.action.unit_type) >= target:
+                return False
+        if self.when is not None and not self.when(agent):
+            return False
+        return self.action.cost is None or agent.can_afford(self.action.cost)
+
+
+class BuildOrder():
+    def __init__(self, steps):
+        self.steps = steps
+        self.index = {}
+        for i, step in enumerate(steps):
+            if step.name in self.index:
+                raise ValueError("Duplicate build step " + step.name)
+            self.index[step.name] = i
+
+        # Steps waiting on each step, and steps retired by each step
+        self.dependents = [[] for _ in steps]
+        self.retires = [[] for _ in steps]
+        self.waiting = [len(step.after) for step in steps]
+        for i, step in enumerate(steps):
+            for name in step.after:
+                self.dependents[self.lookup(name, step)].append(i)
+            for name in step.until:
+                self.retires[self.lookup(name, step)].append(i)
+        self.check_reachable()
+
+        self.successes = [0] * len(steps)
+        self.pending = {}  # Step to the order its action returned that is sent after the step's tasks, see confirm
+        self.complete = [False] * len(steps)
+        self.retired = [False] * len(steps)
+        self.active = [i for i in range(len(steps)) if self.waiting[i] == 0]  # Kept in priority order
+
+    def lookup(self, name, step):
+        if name not in self.index:
+            raise ValueError("Build step {} refers to unknown step {}".format(step.name, name))
+        return self.index[name]
+
+    # Raises if a step can never become active because its after list has a cycle
+    def check_reachable(self):
+        waiting = list(self.waiting)
+        ready = [i for i in range(len(self.steps)) if waiting[i] == 0]
+        reached = 0
+        while ready:
+            i = ready.pop()
+            reached += 1
+            for dependent in self.dependents[i]:
+                waiting[dependent] -= 1
+                if waiting[dependent] == 0:
+                    ready.append(dependent)
+        if reached != len(self.steps):
+            cycle = [step.name for i, step in enumerate(self.steps) if waiting[i] > 0]
+            raise ValueError("Build steps wait on each other: " + ", ".join(cycle))
+
+    '''
+    Evaluates the active steps in priority order and runs the actions of the triggered ones
+    An action returns true when its command was accepted, or an order that is only sent after the step's tasks, like
+    a LarvaRequest. Such an order counts once it is done without an error, and its step waits for it
+    '''
+    async def run(self, agent):
+        self.confirm()
+        for i in list(self.active):
+            if self.complete[i] or self.retired[i] or i in self.pending:
+                continue
+            step = self.steps[i]
+            if not step.is_triggered(agent):
+                continue
+            result = await step.action.run(agent)
+            if result is True:
+                self.succeed(i)
+            elif result:
+                self.pending[i] = result
+
+    # Counts the orders sent since the last run that the game accepted
+    def confirm(self):
+        for i, order in list(self.pending.items()):
+            if not order.is_done:
+                continue
+            del self.pending[i]
+            if order.is_ordered and not self.complete[i] and not self.retired[i]:
+                self.succeed(i)
+
+    def succeed(self, i):
+        self.successes[i] += 1
+        step = self.steps[i]
+        if step.count is not None and self.successes[i] >= step.count:
+            self.finish(i)
+
+    def finish(self, i):
+        self.complete[i] = True
+        self.active.remove(i)
+        for dependent in self.dependents[i]:
+            self.waiting[dependent] -= 1
+            if self.waiting[dependent] == 0 and not self.retired[dependent]:
+                insort(self.active, dependent)
+        for retired in self.retires[i]:
+            self.retired[retired] = True
+            if retired in self.active:
+                self.active.remove(retired)
+
+    def is_done(self, name):
+        return self.complete[self.index[name]]
+
+    def active_steps(self):
+        return [self.steps[i].name for i in self.active]
+
+
+'''
+Actions
+Each has run(agent), which issues the command and returns true if it was accepted or the order that will be sent, and
+cost, what can_afford checks
+'''
+
+# Supply used by the units the agents train
+UNIT_SUPPLY = {DRONE: 1, ZERGLING: 1, OVERLORD: 0, QUEEN: 2, ROACH: 2, HYDRALISK: 2, MUTALISK: 2}
+
+class Train():
+    def __init__(self, unit_type, from_larva = True):
+        self.unit_type = unit_type
+        self.cost = unit_type
+        self.from_larva = from_larva  # Queens train from an idle base instead
+
+    async def run(self, agent):
+        if agent.supply_left < UNIT_SUPPLY.get(self.unit_type, 0):
+            return False
+        if self.from_larva:
+            if agent.num_larva == 0:
+                return False
+            request = await agent.train_from_larva(self.unit_type)
+            # The order is sent after the step's tasks, BuildOrder counts it once the game accepted it
+            return False if request.is_done else request
+        else:
+            bases = agent.bases.ready.noqueue
+            if not bases.exists:
+                return False
+            err = await agent.do(bases.random.train(self.unit_type))
+        return not err
+
+'''
+Builds a structure near the position returned by placement(agent), a coroutine function, see the placements below
+'''
+class Build():
+    def __init__(self, unit_type, placement, max_distance = 20):
+        self.unit_type = unit_type
+        self.cost = unit_type
+        self.placement = placement
+        self.max_distance = max_distance
+
+    async def run(self, agent):
+        position = await self.placement(agent)
+        if position is None or not agent.workers.exists:
+            return False
+        err = await agent.build(self.unit_type, near=position, max_distance=self.max_distance,
+                                unit=agent.spatial_index.own.nearest(position, DRONE))
+        return not err
+
+'''
+Builds an extractor on a free geyser next to a ready base
+'''
+class BuildExtractor():
+    def __init__(self):
+        self.unit_type = EXTRACTOR
+        self.cost = EXTRACTOR
+
+    async def run(self, agent):
+        for base in agent.bases.ready:
+            for geyser in agent.spatial_index.geysers.radius(base.position, 15.0):
+                if agent.spatial_index.own.radius(geyser.position, 1.0, EXTRACTOR):
+                    continue
+                drone = agent.select_build_worker(geyser.position)
+                if drone is None:
+                    return False
+                err = await agent.do(drone.build(EXTRACTOR, geyser))
+                return not err
+        return False
+
+'''
+Uses an ability of an idle ready unit of caster_type: researches, hatchery to lair, zergling to baneling
+'''
+class UseAbility():
+    def __init__(self, ability, caster_type, unit_type = None):
+        self.ability = ability
+        self.cost = ability
+        self.caster_type = caster_type
+        self.unit_type = unit_type  # What the ability makes, needed for steps with a target
+
+    async def run(self, agent):
+        casters = agent.units(self.caster_type).ready.noqueue
+        if not casters.exists:
+            return False
+        err = await agent.do(casters.first(self.ability))
+        return not err
+
+'''
+Anything else, function is a coroutine function of the agent that returns true when it succeeded
+'''
+class Call():
+    def __init__(self, function, cost = None):
+        self.function = function
+        self.cost = cost
+        self.unit_type = None
+
+    async def run(self, agent):
+        return await self.function(agent)
+
+
+'''
+Placements for Build
+'''
+
+'''
+Towards the map center from the first unit of unit_type, which may still be under construction, or from the main base
+'''
+def towards_center(distance, unit_type = None):
+    async def placement(agent):
+        if unit_type is None:
+            origin = agent.bases.ready
+            main = origin.find_by_tag(agent.OG_hatchery)
+            if main is not None:
+                return main.position.to2.towards(agent.game_info.map_center, distance)
+        else:
+            origin = agent.units(unit_type)
+        if not origin.exists:
+            return None
+        return origin.first.position.to2.towards(agent.game_info.map_center, distance)
+    return placement
+
+async def next_expansion(agent):
+    return agent.next_expansion()
@@ -0,0 +1,105 @@
+from sc2.constants import *
+from sc2.data import ActionResult
+
+from pixel_map import pixel_map_array
+
+
+# Structures that do not change where others can be built: tumors do not block building, extractors sit on geysers
+NO_FOOTPRINT = frozenset([CREEPTUMOR, CREEPTUMORBURROWED, CREEPTUMORQUEEN, EXTRACTOR])
+
+# Zerg structures that can be placed off creep
+NO_CREEP_NEEDED = frozenset([HATCHERY, EXTRACTOR])
+
+
+'''
+Finds building positions with one batched placement query per structure and spot
+BotAI.build asks the game about the exact spot first and then about rings of positions until one is free. The service
+asks about every candidate within max_distance of the spot at once and keeps the valid ones, closest first, so the
+next building of the same size near the same spot needs no query. The slots are thrown away when our structures or
+the known enemy structures change, since a new or destroyed building changes what is free. Creep tumors, which queens
+place all game, and extractors are left out since they do not take ground a building could use. Creep comes and goes
+every step, so instead a slot is checked against the creep map when it is handed out
+'''
+class BuildingPlacement():
+    def __init__(self):
+        self.slots = {}  # (creation ability, spot) to its valid positions, closest first
+        self.footprints = {}  # Creation ability to the half width of the structure's footprint
+        self.structures = None  # Tags of our structures and the known enemy structures when the slots were found
+
+        # Per game
+        self.queries = 0  # Placement round trips
+        self.positions = 0  # Positions asked about in them
+        self.hits = 0  # Positions handed out from the slots
+        self.receded = 0  # Slots dropped because the creep under them receded
+
+    def invalidate_if_changed(self, agent):
+        structures = frozenset(unit.tag for unit in (agent.units | agent.known_enemy_structures).filter(
+            lambda unit: unit.is_structure and unit.type_id not in NO_FOOTPRINT))
+        if structures != self.structures:
+            self.structures = structures
+            self.slots = {}
+
+    def footprint(self, ability):
+        if ability.id not in self.footprints:
+            self.footprints[ability.id] = ability._proto.footprint_radius
+        return self.footprints[ability.id]
+
+    # True if every corner and the center of a footprint of half width radius at position has creep
+    @staticmethod
+    def has_creep(creep, position, radius):
+        height, width = creep.shape
+        for dx, dy in ((0, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)):
+            x = min(max(int(position.x + dx * (radius - .5)), 0), width - 1)
+            y = min(max(int(position.y + dy * (radius - .5)), 0), height - 1)
+            if not creep[y, x]:
+                return False
+        return True
+
+    '''
+    The closest valid position for unit_type within max_distance of near, or None
+    '''
+    async def find(self, agent, unit_type, near, max_distance = 20, placement_step = 2):
+        self.invalidate_if_changed(agent)
+        ability = agent._game_data.units[unit_type.value].creation_ability
+        radius = self.footprint(ability)
+        near = near.rounded
+        key = (ability.id, near)
+        if key in self.slots:
+            self.hits += 1
+        else:
+            candidates = [near.offset((dx, dy))
+                          for dx in range(-max_distance, max_distance + 1, placement_step)
+                          for dy in range(-max_distance, max_distance + 1, placement_step)
+                          if dx * dx + dy * dy <= max_distance * max_distance]
+            candidates.sort(key=lambda position: position.distance_to(near))
+            results = await agent._client.query_building_placement(ability, candidates)
+            self.queries += 1
+            self.positions += len(candidates)
+            self.slots[key] = [position for position, result in zip(candidates, results) if result == ActionResult.Success]
+
+        slots = self.slots[key]
+        if slots and unit_type not in NO_CREEP_NEEDED:
+            creep = pixel_map_array(agent.state.creep)
+            while slots and not self.has_creep(creep, slots[0], radius):
+                self.receded += 1
+                slots.pop(0)
+        return slots[0] if slots else None
+
+    # The game rejected the build at position, it is not handed out again
+    def reject(self, unit_type, agent, near, position):
+        key = (agent._game_data.units[unit_type.value].creation_ability.id, near.rounded)
+        if key in self.slots and position in self.slots[key]:
+            self.slots[key].remove(position)
+
+    '''
+    A unit_type was ordered at position, the slots of every size and spot whose footprint overlaps it are taken
+    '''
+    def claim(self, unit_type, agent, position):
+        radius = self.footprint(agent._game_data.units[unit_type.value].creation_ability)
+        for key, slots in self.slots.items():
+            reach = radius + self.footprints.get(key[0], radius)
+            self.slots[key] = [slot for slot in slots if abs(slot.x - position.x) >= reach or abs(slot.y - position.y) >= reach]
+
+    def report(self):
+        return "{} placement queries for {} positions, {} placements from the cache, {} dropped as the creep receded".format(
+            self.queries, self.positions, self.hits, self.receded)
@@ -0,0 +1,84 @@
+from sc2.unit import Unit
+
+
+'''
+True if the current order of unit has ability and target, a point or a unit
+Points closer than tolerance are the same target
+'''
+def has_order(unit, ability, target, tolerance = .5):
+    if not unit.orders:
+        return False
+    order = unit.orders[0]
+    if order.ability.id != ability:
+        return False
+    if isinstance(target, Unit):
+        return order.target == target.tag
+    if target is None:
+        return order.target is None
+    return order.target is not None and not isinstance(order.target, int) and order.target.distance_to(target) < tolerance
+
+def target_key(target):
+    if isinstance(target, Unit):
+        return target.tag
+    if target is None:
+        return None
+    return (round(target.x, 1), round(target.y, 1))
+
+
+'''
+Drops commands that would not change what a unit does
+Many loops give a unit the order it already has every step: idle workers are sent to gather again, and the extractor
+loop sends workers to an extractor before its assigned_harvesters counts the ones sent a few loops ago. A command is
+dropped when the unit's current order has the same ability and target, or when it is the last command sent to the
+unit, in the last window_loops game loops, and the observation has not caught up yet. Only the last command of each
+unit is kept, so after attack then move the attack is no longer a repeat
+Only commands that cost nothing are filtered, training and morphing the same unit again queues another one
+'''
+class CommandFilter():
+    def __init__(self, window_loops = 16):
+        self.window_loops = window_loops
+        self.sent = {}  # Unit tag to the ability, target and game loop of the last command sent to it
+        self.last_prune = 0
+
+        # Per game
+        self.checked = 0
+        self.in_effect = 0  # Dropped because the unit already had the order
+        self.repeated = 0  # Dropped because it was sent in the window
+
+    def is_redundant(self, action, game_loop):
+        if action.queue:
+            return False
+        self.checked += 1
+        if has_order(action.unit, action.ability, action.target):
+            self.in_effect += 1
+            return True
+        last = self.sent.get(action.unit.tag)
+        if last is not None and last[:2] == (action.ability, target_key(action.target)) and \
+                game_loop - last[2] < self.window_loops:
+            self.repeated += 1
+            return True
+        return False
+
+    def record(self, action, game_loop):
+        if action.queue:
+            # The unit still does what it was last sent
+            return
+        self.sent[action.unit.tag] = (action.ability, target_key(action.target), game_loop)
+        if game_loop - self.last_prune >= self.window_loops:
+            self.last_prune = game_loop
+            self.sent = {tag: last for tag, last in self.sent.items() if game_loop - last[2] < self.window_loops}
+
+    # For a command that is not filtered, the unit no longer follows its last free command
+    def forget(self, action):
+        if not action.queue:
+            self.sent.pop(action.unit.tag, None)
+
+    # Units whose last command, sent in the window, was ability on target
+    def recent(self, ability, target, game_loop):
+        key = (ability, target_key(target))
+        return sum(1 for last in self.sent.values() if last[:2] == key and game_loop - last[2] < self.window_loops)
+
+    def report(self):
+        dropped = self.in_effect + self.repeated
+        return "{} free commands checked, {} dropped ({:0.1%}): {} already in effect, {} sent in the last {} loops".format(
+            self.checked, dropped, dropped / max(self.checked, 1), self.in_effect, self.repeated, self.window_loops)
@@ -0,0 +1,89 @@
+import numpy
+
+from sc2.position import Point2
+
+from pixel_map import pixel_map_array
+
+
+'''
+Plans where creep tumors go from the creep map instead of trying positions with placement queries
+The frontier is the creep that touches buildable ground without creep, found with NumPy over the whole map every
+refresh_loops game loops. Each tumor or queen gets the frontier cell in its range that is closest to the target, cells
+near a spot already handed out are left for other tumors, so one placement query is made per tumor
+A burrowed tumor spreads once, the planner remembers which did and waits cooldown_loops before asking again for a
+tumor whose spread failed (it was not ready yet or the spot was taken)
+'''
+class CreepPlanner():
+    def __init__(self, tumor_range = 10, refresh_loops = 22, cooldown_loops = 300, spacing = 4):
+        self.tumor_range = tumor_range
+        self.refresh_loops = refresh_loops
+        self.cooldown_loops = cooldown_loops
+        self.spacing = spacing  # Smallest distance between two spots handed out before the creep map shows them
+
+        self.placeable = None  # Buildable ground from the map analysis, it does not change during a game
+        self.frontier = numpy.zeros((0, 2))  # x, y of the frontier cells
+        self.last_refresh = None
+
+        self.spread = set()  # Tags of the tumors that spread
+        self.retry_loop = {}  # Tag of a tumor to the game loop its spread is tried again
+
+        # Per game
+        self.queries = 0
+
+    def refresh(self, agent):
+        game_loop = agent.state.game_loop
+        if self.last_refresh is not None and game_loop - self.last_refresh < self.refresh_loops:
+            return
+        self.last_refresh = game_loop
+
+        if self.placeable is None:
+            self.placeable = agent.map_analysis.placement
+        creep = pixel_map_array(agent.state.creep)
+
+        # Creep cells with a placeable cell without creep next to them
+        open_ground = self.placeable & ~creep
+        edge = numpy.zeros_like(creep)
+        edge[1:, :] |= open_ground[:-1, :]
+        edge[:-1, :] |= open_ground[1:, :]
+        edge[:, 1:] |= open_ground[:, :-1]
+        edge[:, :-1] |= open_ground[:, 1:]
+        ys, xs = numpy.nonzero(creep & self.placeable & edge)
+        self.frontier = numpy.stack([xs + .5, ys + .5], axis=1)
+
+    '''
+    The frontier cell within distance of origin that is closest to target, or None
+    The spot is claimed, the frontier cells around it are not handed out again until the next refresh
+    '''
+    def spot(self, origin, target, distance = None):
+        if len(self.frontier) == 0:
+            return None
+        distance = self.tumor_range if distance is None else distance
+        in_range = numpy.sum((self.frontier - (origin.x, origin.y)) ** 2, axis=1) <= distance ** 2
+        if not in_range.any():
+            return None
+        to_target = numpy.sum((self.frontier - (target.x, target.y)) ** 2, axis=1)
+        best = self.frontier[numpy.argmin(numpy.where(in_range, to_target, numpy.inf))]
+
+        self.frontier = self.frontier[numpy.sum((self.frontier - best) ** 2, axis=1) > self.spacing ** 2]
+        return Point2((float(best[0]), float(best[1])))
+
+    def can_spread(self, tumor, game_loop):
+        return tumor.tag not in self.spread and self.retry_loop.get(tumor.tag, 0) <= game_loop
+
+    def has_spread(self, tumor):
+        return tumor.tag in self.spread
+
+    def mark_spread(self, tumor):
+        self.spread.add(tumor.tag)
+        self.retry_loop.pop(tumor.tag, None)
+
+    def wait(self, tumor, game_loop):
+        self.retry_loop[tumor.tag] = game_loop + self.cooldown_loops
+
+    # One placement query
+    async def can_place(self, agent, unit_type, position):
+        self.queries += 1
+        return await agent.can_place(unit_type, position)
+
+    def report(self):
+        return "{} creep tumor placement queries".format(self.queries)
@@ -0,0 +1,172 @@
+import json
+import os
+import struct
+import time
+from time import strftime, localtime
+
+import numpy
+
+from selector_config import raceName
+
+'''
+Decision files hold every decision step of one game so the networks can be trained and evaluated offline
+Layout: 8 byte magic, 4 byte little endian header length, JSON schema header padded to 16 bytes, then
+one float32 row per decision step. Rows are only ever appended, so the number of rows is derived from the file size
+and a game that crashes still leaves a readable file
+'''
+MAGIC = b"LOSERDEC"
+VERSION = 1
+
+# Columns that follow the game inputs in every row
+DECISION_COLUMNS = ["iteration", "prevAgent", "prevStrategy", "agent", "strategy", "correctChoice"]
+
+
+class DecisionRecorder():
+    def __init__(self, fileName, nInputs, nAgents, nStrategies, opponent_race, bufferRows = 64):
+        self.fileName = fileName
+        self.nInputs = nInputs
+        self.rowWidth = nInputs + len(DECISION_COLUMNS)
+        self.nRows = 0
+        self.time = 0  # Seconds spent in record and flush, see AgentSelector.on_end
+
+        # Rows are written into a preallocated buffer and only hit the disk once it is full
+        self.buffer = numpy.zeros((bufferRows, self.rowWidth), dtype=numpy.float32)
+        self.bufferedRows = 0
+
+        directory = os.path.dirname(fileName)
+        if directory and not os.path.exists(directory):
+            os.mkdir(directory)
+
+        header = json.dumps({
+            "version": VERSION,
+            "dtype": "float32",
+            "nInputs": nInputs,
+            "nAgents": nAgents,
+            "nStrategies": nStrategies,
+            "opponent_race": opponent_race,
+            "columns": ["input{}".format(i) for i in range(nInputs)] + DECISION_COLUMNS
+        }).encode("utf-8")
+        header += b" " * (-(len(MAGIC) + 4 + len(header)) % 16)
+
+        self.file = open(fileName, "ab")
+        if self.file.tell() == 0:
+            self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    '''
+    Adds one decision step to the buffer, flushing the buffer to disk when it is full
+    '''
+    def record(self, iteration, inputs, prevAgent, prevStrategy, agent, strategy, correctChoice):
+        start = time.perf_counter()
+        row = self.buffer[self.bufferedRows]
+        row[:self.nInputs] = inputs
+        row[self.nInputs:] = (iteration, prevAgent, prevStrategy, agent, strategy, correctChoice)
+        self.bufferedRows += 1
+        self.nRows += 1
+        if self.bufferedRows == len(self.buffer):
+            self.flush()
+        self.time += time.perf_counter() - start
+
+    def flush(self):
+        if self.bufferedRows == 0 or self.file is None:
+            return
+        self.file.write(self.buffer[:self.bufferedRows].tobytes())
+        self.file.flush()
+        self.bufferedRows = 0
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        self.file.close()
+        self.file = None
+
+'''
+Builds the file name for a new game against the given race
+'''
+def decisionFileName(opponent_race, directory = "./decisions"):
+    return "{}/{}_{}.dec".format(directory, raceName(opponent_race), strftime("%Y-%m-%d %H%M%S", localtime()))
+
+'''
+Reads the schema header of a decision file and returns it with the byte offset of the first row
+'''
+def readHeader(path):
+    with open(path, "rb") as decisionFile:
+        magic = decisionFile.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError("{} is not a decision file".format(path))
+        headerLength = struct.unpack("<I", decisionFile.read(4))[0]
+        header = json.loads(decisionFile.read(headerLength).decode("utf-8"))
+    if header["version"] != VERSION:
+        raise ValueError("{} has unsupported version {}".format(path, header["version"]))
+    return header, len(MAGIC) + 4 + headerLength
+
+'''
+Returns the header and the rows of a decision file
+The rows are memory mapped, so nothing is read until it is used
+'''
+def readDecisionFile(path):
+    header, offset = readHeader(path)
+    rowWidth = len(header["columns"])
+    nRows = (os.path.getsize(path) - offset) // (rowWidth * 4)
+    if nRows == 0:
+        return header, numpy.zeros((0, rowWidth), dtype=numpy.float32)
+    return header, numpy.memmap(path, dtype=numpy.float32, mode="r", offset=offset, shape=(nRows, rowWidth))
+
+'''
+Splits decision rows into the named columns used to train the networks
+'''
+def splitColumns(header, rows):
+    nInputs = header["nInputs"]
+    data = {"inputs": rows[:, :nInputs]}
+    for i, column in enumerate(DECISION_COLUMNS):
+        data[column] = rows[:, nInputs + i]
+    data["nAgents"] = header["nAgents"]
+    data["nStrategies"] = header["nStrategies"]
+    return data
+
+'''
+Loads and concatenates decision files recorded against the same race into memory
+'''
+def loadDecisionData(paths):
+    headers = []
+    rows = []
+    for path in paths:
+        header, fileRows = readDecisionFile(path)
+        if headers and (header["nInputs"], header["nAgents"], header["nStrategies"]) != \
+                (headers[0]["nInputs"], headers[0]["nAgents"], headers[0]["nStrategies"]):
+            raise ValueError("{} does not match the schema of {}".format(path, paths[0]))
+        headers.append(header)
+        rows.append(numpy.array(fileRows))
+    if not headers:
+        raise ValueError("No decision files given")
+    return splitColumns(headers[0], numpy.concatenate(rows))
+
+'''
+Builds the network inputs and outputs exactly the way AgentSelector.learn does, but for every row at once
+Agent network: inputs + previous agent + previous strategy -> certainty the chosen agent was correct
+Strategy network: inputs + chosen agent + previous agent + previous strategy -> certainty the chosen strategy was correct
+Fused network: the agent network inputs and the chosen agent -> both outputs, with the chosen agent and strategy
+'''
+def buildTrainingSets(data):
+    nRows = len(data["correctChoice"])
+    rows = numpy.arange(nRows)
+    correct = data["correctChoice"].astype(numpy.float32)
+    prevAgent = numpy.zeros((nRows, data["nAgents"]), dtype=numpy.float32)
+    prevAgent[rows, data["prevAgent"].astype(int)] = 1
+    prevStrategy = numpy.zeros((nRows, data["nStrategies"]), dtype=numpy.float32)
+    prevStrategy[rows, data["prevStrategy"].astype(int)] = 1
+    predAgent = numpy.zeros((nRows, data["nAgents"]), dtype=numpy.float32)
+    predAgent[rows, data["agent"].astype(int)] = 1
+
+    agentOutputs = numpy.repeat((1 - correct)[:, None], data["nAgents"], axis=1)
+    agentOutputs[rows, data["agent"].astype(int)] = correct
+    strategyOutputs = numpy.repeat((1 - correct)[:, None], data["nStrategies"], axis=1)
+    strategyOutputs[rows, data["strategy"].astype(int)] = correct
+
+    inputs = numpy.asarray(data["inputs"], dtype=numpy.float32)
+    agentInputs = numpy.hstack([inputs, prevAgent, prevStrategy])
+    strategyInputs = numpy.hstack([inputs, predAgent, prevAgent, prevStrategy])
+    return {"agent": (agentInputs, agentOutputs, data["agent"].astype(int), correct),
+            "strategy": (strategyInputs, strategyOutputs, data["strategy"].astype(int), correct),
+            "fused": (agentInputs, predAgent, agentOutputs, strategyOutputs, data["agent"].astype(int),
+                      data["strategy"].astype(int), correct)}
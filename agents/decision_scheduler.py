@@ -0,0 +1,85 @@
+from collections import defaultdict
+
+
+'''
+Decides on which steps AgentSelector chooses a new agent and strategy
+Every checkInterval steps cheap change detectors compare the game to the last decision: the unit balance, the number of known
+enemy units and the size of our army. A decision is made as soon as one of them fires (but never sooner than minInterval
+steps after the last one), otherwise after interval steps. Each decision that nothing triggered doubles interval up to
+maxInterval, so a stable game is looked at less and less, and a triggered decision resets it to baseInterval
+With isAdaptive set to false a decision is made every baseInterval steps, the old fixed stepsPerAgent behaviour
+'''
+class DecisionScheduler():
+    def __init__(self, isAdaptive = True, baseInterval = 100, minInterval = 25, maxInterval = 400, checkInterval = 10,
+                 balanceChange = .1, enemyChange = 4, armyLoss = 3):
+        self.isAdaptive = isAdaptive
+        self.baseInterval = baseInterval
+        self.minInterval = minInterval
+        self.maxInterval = maxInterval
+        self.checkInterval = checkInterval
+
+        # Detector thresholds: fraction of the unit balance, enemy units seen or lost, our army units lost
+        self.balanceChange = balanceChange
+        self.enemyChange = enemyChange
+        self.armyLoss = armyLoss
+
+        self.interval = baseInterval
+        self.lastDecision = None
+        self.lastObservation = None
+
+        # Metrics
+        self.decisions = 0
+        self.reasons = defaultdict(int)
+        self.networkTime = 0  # Seconds spent training and predicting with the networks
+
+    '''
+    Returns true if a decision should be made on this step, and if so counts it as made
+    observe() returns (unit balance, known enemy unit count, army unit count) and is only called on steps that check for changes
+    '''
+    def isDecisionStep(self, iteration, observe):
+        if self.lastDecision is None:
+            return self.decide(iteration, observe(), "first")
+
+        sinceLast = iteration - self.lastDecision
+        if not self.isAdaptive:
+            return sinceLast >= self.baseInterval and self.decide(iteration, None, "interval")
+
+        if sinceLast >= self.interval:
+            self.interval = min(self.interval * 2, self.maxInterval)
+            return self.decide(iteration, observe(), "interval")
+
+        if sinceLast < self.minInterval or sinceLast % self.checkInterval != 0:
+            return False
+
+        observation = observe()
+        reason = self.detectChange(observation)
+        if reason is None:
+            return False
+        self.interval = self.baseInterval
+        return self.decide(iteration, observation, reason)
+
+    # Returns the name of the first detector that fires, or None
+    def detectChange(self, observation):
+        balance, enemies, army = observation
+        lastBalance, lastEnemies, lastArmy = self.lastObservation
+        if abs(balance - lastBalance) >= self.balanceChange * max(abs(lastBalance), 1):
+            return "balance"
+        if abs(enemies - lastEnemies) >= self.enemyChange:
+            return "enemies"
+        if lastArmy - army >= self.armyLoss:
+            return "army losses"
+        return None
+
+    def decide(self, iteration, observation, reason):
+        self.lastDecision = iteration
+        self.lastObservation = observation
+        self.decisions += 1
+        self.reasons[reason] += 1
+        return True
+
+    def addNetworkTime(self, seconds):
+        self.networkTime += seconds
+
+    def report(self):
+        reasons = ", ".join("{} {}".format(count, reason) for reason, count in sorted(self.reasons.items()))
+        return "{} decisions ({}), {:0.1f}ms in the networks".format(self.decisions, reasons, self.networkTime * 1000)
@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+
+'''
+Runs AgentSelector decisions on a worker thread so on_step returns to the game quickly
+A decision (learn() and predicting the next agent and strategy) is a few blocking Keras calls. Submitting it here
+lets the current sub-agent keep playing, and the result is picked up with result() on a later step once it is ready
+Only one decision runs at a time, so the networks are never trained or read from two threads at once
+'''
+class DecisionWorker():
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = None
+
+    def submit(self, decide, *args):
+        if self.isBusy():
+            raise RuntimeError("A decision is already running")
+        self.pending = asyncio.get_event_loop().run_in_executor(self.executor, decide, *args)
+
+    def isBusy(self):
+        return self.pending is not None and not self.pending.done()
+
+    def isReady(self):
+        return self.pending is not None and self.pending.done()
+
+    '''
+    Returns what the finished decision returned and clears it, exceptions raised by the decision are raised here
+    '''
+    def result(self):
+        future = self.pending
+        self.pending = None
+        return future.result()
+
+    # Waits for a running decision to finish, so weights it is saving are not cut off
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+'''
+Worst and average latency of on_step, kept separately for decision steps and for the other steps
+'''
+class StepLatency():
+    def __init__(self):
+        self.worstDecision = 0
+        self.worstOther = 0
+        self.totalDecision = 0
+        self.totalOther = 0
+        self.nDecision = 0
+        self.nOther = 0
+
+    def record(self, seconds, isDecisionStep):
+        if isDecisionStep:
+            self.worstDecision = max(self.worstDecision, seconds)
+            self.totalDecision += seconds
+            self.nDecision += 1
+        else:
+            self.worstOther = max(self.worstOther, seconds)
+            self.totalOther += seconds
+            self.nOther += 1
+
+    # Seconds spent in all steps
+    @property
+    def total(self):
+        return self.totalDecision + self.totalOther
+
+    def report(self):
+        return "decision steps worst {:0.2f}ms mean {:0.2f}ms, other steps worst {:0.2f}ms mean {:0.2f}ms".format(
+            self.worstDecision * 1000, self.totalDecision / max(self.nDecision, 1) * 1000,
+            self.worstOther * 1000, self.totalOther / max(self.nOther, 1) * 1000)
+
+
+#Stand-in for a realtime game: steps arrive every game loop (22.4 per second on Faster) and every 100th step is a decision
+#with the same networks and input sizes AgentSelector uses against protoss, made blocking and then with a DecisionWorker
+#A step that takes longer than a game loop means the bot misses game loops in realtime mode
+#Needs Keras on TensorFlow 1.x like NeuralNetwork, it has not been run yet so the gain of the worker thread is unverified
+if __name__ == '__main__':
+    from NeuralNetwork import NeuralNetwork
+
+    nInputs, nAgents, nStrategies = 83, 4, 11
+    stepsPerAgent, nSteps, loopTime, agentStepTime = 100, 1000, 1 / 22.4, .002
+    agentNN = NeuralNetwork(nInputs + nAgents + nStrategies, nAgents, 1, 1, 100, 3, "benchmark_agent")
+    strategyNN = NeuralNetwork(nInputs + 2 * nAgents + nStrategies, nStrategies, 1, 1, 100, 3, "benchmark_strategy")
+
+    def decide(curInputs):
+        agent = [0, 1, 0, 0]
+        strategy = [0] * nStrategies
+        strategy[3] = 1
+        agentNN.train([curInputs + agent + strategy], [agent])
+        strategyNN.train([curInputs + agent + agent + strategy], [strategy])
+        nextAgent = agentNN.predict([curInputs + agent + strategy])[0].tolist()
+        nextAgent = [value if value == max(nextAgent) else 0 for value in nextAgent]
+        return strategyNN.predict([curInputs + nextAgent + agent + strategy])[0].tolist()
+
+    async def play(isOffloading):
+        worker = DecisionWorker()
+        latency = StepLatency()
+        missedLoops = 0
+        for iteration in range(nSteps):
+            start = time.perf_counter()
+            isDecisionStep = iteration % stepsPerAgent == 0
+            if worker.isReady():
+                worker.result()
+            if isDecisionStep and not worker.isBusy():
+                curInputs = numpy.random.rand(nInputs).tolist()
+                if isOffloading:
+                    worker.submit(decide, curInputs)
+                else:
+                    decide(curInputs)
+            time.sleep(agentStepTime)  # The sub-agent's own on_step work
+            elapsed = time.perf_counter() - start
+            latency.record(elapsed, isDecisionStep)
+            missedLoops += int(elapsed // loopTime)
+            await asyncio.sleep(max(loopTime - elapsed, 0))
+        worker.shutdown()
+        return latency, missedLoops
+
+    decide(numpy.random.rand(nInputs).tolist())
+    loop = asyncio.get_event_loop()
+    for name, isOffloading in (("blocking", False), ("worker thread", True)):
+        latency, missedLoops = loop.run_until_complete(play(isOffloading))
+        print("### {}: {}, {} game loops missed".format(name, latency.report(), missedLoops))
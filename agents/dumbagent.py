@@ -10,29 +10,15 @@ class DumbAgent(LoserAgent):
 
         #ZerglingBanelingRushAgent.mainAgent = self
 
+    # Runs without a strategy when played on its own
     async def on_step(self, iteration, strategy_num = -1):
-        # self.log("Step: %s Overlord: %s" % (str(iteration), str(self.units(OVERLORD).amount)))
-        # self.log("Step: " + str(iteration))
-
-        # TEMP: Until strategy is given by Q table
-        #strategy_num = (int)(iteration / 75) % 8
-
-        # Build lings, queen, overlords, drones, and meleeattack1
-        await self.basic_build(iteration)
-
-        # Perform actions based on given strategy
-        if strategy_num == -1:
-            # self.mainAgent.log("No given strategy")
-            pass
-        else:
-            await self.perform_strategy(iteration, strategy_num)
+        await super().on_step(iteration, strategy_num)
 
     async def basic_build(self, iteration):
-        larvae = self.mainAgent.units(LARVA)
-        if larvae.exists and self.mainAgent.can_afford(DRONE) and self.mainAgent.supply_left > 0:
-            await self.mainAgent.do(larvae.random.train(DRONE))
-        if larvae.exists and self.mainAgent.can_afford(OVERLORD) and self.mainAgent.supply_left == 0:
-            await  self.mainAgent.do(larvae.random.train(OVERLORD))
+        if self.mainAgent.num_larva > 0 and self.mainAgent.can_afford(DRONE) and self.mainAgent.supply_left > 0:
+            await self.mainAgent.train_from_larva(DRONE)
+        if self.mainAgent.num_larva > 0 and self.mainAgent.can_afford(OVERLORD) and self.mainAgent.supply_left == 0:
+            await self.mainAgent.train_from_larva(OVERLORD)
 
 
 def main():
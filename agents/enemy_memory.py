@@ -0,0 +1,185 @@
+#!/usr/bin/python3
+import random
+import time
+from collections import defaultdict
+from itertools import chain
+
+import numpy
+
+
+VISIBLE = 2  # Value of a visible cell in the visibility map, 1 is fogged and 0 never seen
+
+
+'''
+Enemy units seen during the game, including the ones now in the fog of war
+Each unit has one record keyed by its tag with its type, last position and the game loop it was last seen on, kept in
+fixed size arrays. The game reports every visible unit on every step, not what changed, so a step still reads the tag,
+type and position of each visible unit once. It reads them into arrays and writes them in one operation, only new
+units and units that morphed are handled one at a time. Records are dropped when the unit dies,
+when the place it was last seen is visible again without it, and when it was not seen for expireLoops. When all
+capacity records are used the one seen longest ago makes room
+'''
+class EnemyMemory():
+    def __init__(self, expireLoops = 1344, capacity = 512, expireInterval = 22):
+        self.expireLoops = expireLoops
+        self.capacity = capacity
+        self.expireInterval = expireInterval  # Game loops between looking for expired and moved records
+
+        self.slots = {}  # Unit tag to its record
+        self.free = list(range(capacity - 1, -1, -1))
+        self.tags = [None] * capacity
+        self.typeIds = numpy.zeros(capacity, dtype=numpy.int32)
+        self.positions = numpy.zeros((capacity, 2), dtype=numpy.float32)
+        self.lastSeen = numpy.zeros(capacity, dtype=numpy.int64)
+        self.used = numpy.zeros(capacity, dtype=bool)
+        self.names = {}  # Type id to the unit name the breakdowns use
+        self.lastExpire = 0
+
+        # Metrics
+        self.peak = 0
+        self.died = 0
+        self.moved = 0  # Dropped because their last position was visible without them
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self.slots)
+
+    def remove(self, slot):
+        del self.slots[self.tags[slot]]
+        self.tags[slot] = None
+        self.used[slot] = False
+        self.free.append(slot)
+
+    def allocate(self):
+        if not self.free:
+            self.evicted += 1
+            self.remove(int(numpy.argmin(numpy.where(self.used, self.lastSeen, numpy.iinfo(numpy.int64).max))))
+        return self.free.pop()
+
+    '''
+    Takes in the known enemy units of the current step, the tags of the units that died on it, and the visibility map
+    as an array indexed [y, x], see pixel_map_values
+    '''
+    def update(self, units, gameLoop, deadTags = (), visibility = None):
+        for tag in deadTags:
+            slot = self.slots.get(tag)
+            if slot is not None:
+                self.died += 1
+                self.remove(slot)
+
+        count = len(units)
+        slots = numpy.fromiter((self.slots.get(unit.tag, -1) for unit in units), dtype=numpy.int64, count=count)
+        typeIds = numpy.fromiter((unit.type_id.value for unit in units), dtype=numpy.int32, count=count)
+        positions = numpy.fromiter(chain.from_iterable(unit.position.to2 for unit in units), dtype=numpy.float32,
+                                   count=2 * count).reshape(-1, 2)
+        # Seen units are not the ones that make room for the new ones
+        self.lastSeen[slots[slots >= 0]] = gameLoop
+
+        for i in numpy.nonzero(slots < 0)[0].tolist():
+            unit = units[i]
+            slot = self.allocate()
+            self.slots[unit.tag] = slot
+            self.tags[slot] = unit.tag
+            self.used[slot] = True
+            self.lastSeen[slot] = gameLoop
+            self.typeIds[slot] = -1
+            slots[i] = slot
+
+        # Units keep their tag when they morph
+        for i in numpy.nonzero(self.typeIds[slots] != typeIds)[0].tolist():
+            if typeIds[i] not in self.names:
+                self.names[int(typeIds[i])] = units[i].name
+        self.typeIds[slots] = typeIds
+        self.positions[slots] = positions
+        self.peak = max(self.peak, len(self.slots))
+
+        if gameLoop - self.lastExpire >= self.expireInterval:
+            self.lastExpire = gameLoop
+            for slot in numpy.nonzero(self.used & (gameLoop - self.lastSeen > self.expireLoops))[0].tolist():
+                self.expired += 1
+                self.remove(slot)
+            if visibility is not None:
+                # Units not seen on this step whose last position is in vision now have moved or are gone
+                unseen = numpy.nonzero(self.used & (self.lastSeen < gameLoop))[0]
+                height, width = visibility.shape
+                xs = numpy.clip(self.positions[unseen, 0].astype(int), 0, width - 1)
+                ys = numpy.clip(self.positions[unseen, 1].astype(int), 0, height - 1)
+                for slot in unseen[visibility[ys, xs] == VISIBLE].tolist():
+                    self.moved += 1
+                    self.remove(slot)
+
+    '''
+    Number of remembered units of each unit name
+    '''
+    def counts(self):
+        counts = defaultdict(int)
+        typeIds, amounts = numpy.unique(self.typeIds[self.used], return_counts=True)
+        for typeId, amount in zip(typeIds.tolist(), amounts.tolist()):
+            counts[self.names[typeId]] += amount
+        return counts
+
+    def report(self):
+        return "{} enemy units remembered at most, {} died, {} gone from where they were seen, {} forgotten after {} loops, " \
+               "{} dropped for room".format(self.peak, self.died, self.moved, self.expired, self.expireLoops, self.evicted)
+
+
+'''
+Benchmark of the per step update with 200 visible enemy units, against writing each record in Python as before, and
+a check that dead units and units gone from a visible position are dropped
+'''
+if __name__ == '__main__':
+    class TypeId():
+        def __init__(self, value):
+            self.value = value
+
+    class Point(tuple):
+        @property
+        def to2(self):
+            return self
+
+    class Unit():
+        def __init__(self, tag):
+            self.tag = tag
+            self.type_id = TypeId(random.randint(1, 20))
+            self.name = "Unit{}".format(self.type_id.value)
+            self.position = Point((random.random() * 200, random.random() * 176))
+
+    def update_each(memory, units, gameLoop):
+        for unit in units:
+            slot = memory.slots.get(unit.tag)
+            if slot is None:
+                slot = memory.allocate()
+                memory.slots[unit.tag] = slot
+                memory.tags[slot] = unit.tag
+                memory.used[slot] = True
+            typeId = unit.type_id.value
+            if typeId not in memory.names:
+                memory.names[typeId] = unit.name
+            memory.typeIds[slot] = typeId
+            memory.positions[slot] = unit.position[0], unit.position[1]
+            memory.lastSeen[slot] = gameLoop
+
+    random.seed(0)
+    nUnits, nSteps = 200, 2000
+    units = [Unit(tag) for tag in range(nUnits)]
+
+    def timed(update):
+        memory = EnemyMemory()
+        start = time.perf_counter()
+        for step in range(nSteps):
+            update(memory, units, step)
+        return (time.perf_counter() - start) / nSteps * 1e6
+
+    each = timed(update_each)
+    arrays = timed(lambda memory, units, gameLoop: memory.update(units, gameLoop))
+
+    memory = EnemyMemory()
+    memory.update(units, 0)
+    visibility = numpy.zeros((176, 200), dtype=numpy.uint8)
+    gone = units[2]
+    visibility[int(gone.position[1]), int(gone.position[0])] = VISIBLE
+    memory.update(units[3:], 22, deadTags=[units[0].tag, units[1].tag], visibility=visibility)
+    assert len(memory) == nUnits - 3 and memory.died == 2 and memory.moved == 1
+    assert sum(memory.counts().values()) == nUnits - 3
+    print("### {} visible units: {:0.1f}us per step writing each record, {:0.1f}us with arrays".format(nUnits, each, arrays))
@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+import random
+import time
+
+
+'''
+Expansions in the order the agent takes them, closest by ground first, and which of them are taken
+BotAI.get_next_expansion checks every expansion against every townhall and asks the game for the path to each free one
+on every call. The planner orders the expansions once by the ground distances of the map analysis, marks the ones with
+a townhall (ours or a known enemy one) when the townhalls change, and keeps the index of the first free one, so
+next() is a lookup
+'''
+class ExpansionPlanner():
+    def __init__(self, expansions, distances, gap = 15):
+        self.gap = gap  # A townhall closer than this to an expansion takes it
+        # Unreachable expansions (distance -1) go last
+        order = sorted(range(len(expansions)), key=lambda i: (distances[i] < 0, distances[i]))
+        self.expansions = [expansions[i] for i in order]
+        self.distances = [distances[i] for i in order]
+        self.taken = [False] * len(self.expansions)
+        self.townhalls = None  # Tags of the townhalls the taken expansions were found from
+        self.next_index = 0
+
+    @classmethod
+    def from_analysis(cls, analysis, start_location):
+        return cls(analysis.expansions, analysis.expansion_distances(start_location))
+
+    def update(self, townhalls):
+        tags = frozenset(townhall.tag for townhall in townhalls)
+        if tags == self.townhalls:
+            return
+        self.townhalls = tags
+
+        self.taken = [any(expansion.distance_to(townhall.position) < self.gap for townhall in townhalls)
+                      for expansion in self.expansions]
+        self.next_index = next((i for i, taken in enumerate(self.taken) if not taken), len(self.expansions))
+
+    def next(self):
+        if self.next_index == len(self.expansions):
+            return None
+        return self.expansions[self.next_index]
+
+
+'''
+Benchmark of next() against what get_next_expansion computes on every call with 16 expansions and 2 to 6 townhalls,
+leaving out its path queries, one round trip to the game per free expansion, which the planner does not make either
+'''
+if __name__ == '__main__':
+    class Point():
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+        def distance_to(self, other):
+            return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** .5
+
+    class Townhall():
+        def __init__(self, tag, position):
+            self.tag, self.position = tag, position
+
+    random.seed(0)
+    expansions = [Point(random.random() * 200, random.random() * 176) for _ in range(16)]
+    main = expansions[0]
+    nCalls = 100000
+
+    def get_next_expansion(townhalls):
+        closest, distance = None, float("inf")
+        for expansion in expansions:
+            if any(townhall.position.distance_to(expansion) < 15 for townhall in townhalls):
+                continue
+            d = main.distance_to(expansion)
+            if d < distance:
+                closest, distance = expansion, d
+        return closest
+
+    planner = ExpansionPlanner(expansions, [main.distance_to(expansion) for expansion in expansions])
+    for nTownhalls in (2, 4, 6):
+        townhalls = [Townhall(i, expansion) for i, expansion in enumerate(sorted(expansions, key=main.distance_to)[:nTownhalls])]
+
+        start = time.perf_counter()
+        for _ in range(nCalls):
+            expected = get_next_expansion(townhalls)
+        naive = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(nCalls):
+            planner.update(townhalls)
+            found = planner.next()
+        planned = time.perf_counter() - start
+
+        assert found is expected
+        print("### {} townhalls: get_next_expansion {:0.2f}us, planner update and next {:0.2f}us per call".format(
+            nTownhalls, naive / nCalls * 1e6, planned / nCalls * 1e6))
@@ -0,0 +1,100 @@
+import time
+from collections import OrderedDict
+
+import numpy
+
+from sc2.position import Point2
+
+from map_analysis import ground_distances, cells_near, UNREACHABLE
+
+
+'''
+Ground distance fields towards targets, shared by everything that moves to the same place
+A field holds the number of steps from every pathable cell to the cells around a target, computed with the same
+vectorized breadth first search as the map analysis. Targets are grouped into blocks of block_size cells so nearby
+targets share a field, and the last capacity fields are kept. The fields from the start locations are already in the
+map analysis and are used as they are. Following the field downhill from any cell walks the ground path to the target
+'''
+class FlowFields():
+    def __init__(self, analysis, capacity = 16, block_size = 4):
+        self.analysis = analysis
+        self.capacity = capacity
+        self.block_size = block_size
+        self.pathable = analysis.pathing
+        self.fields = OrderedDict()  # Target block to its field, least recently used first
+
+        # Per game
+        self.hits = 0
+        self.misses = 0
+        self.compute_time = 0
+
+    def block(self, target):
+        return int(target.x // self.block_size), int(target.y // self.block_size)
+
+    '''
+    Steps to target from every cell, UNREACHABLE where no ground path leads to it
+    '''
+    def field(self, target):
+        for location in self.analysis.start_locations:
+            if location.distance_to(target) < self.block_size:
+                return self.analysis.distances_from(location)
+
+        key = self.block(target)
+        if key in self.fields:
+            self.hits += 1
+            self.fields.move_to_end(key)
+            return self.fields[key]
+
+        self.misses += 1
+        start = time.perf_counter()
+        center = ((key[0] + .5) * self.block_size, (key[1] + .5) * self.block_size)
+        field = ground_distances(self.pathable, cells_near(self.pathable, center))
+        self.compute_time += time.perf_counter() - start
+
+        self.fields[key] = field
+        if len(self.fields) > self.capacity:
+            self.fields.popitem(last=False)
+        return field
+
+    # Cell y, x of position, or the closest cell within radius that has a path when it has none, None if none does
+    def reachable_cell(self, field, position, radius = 4):
+        height, width = field.shape
+        x, y = min(max(int(position.x), 0), width - 1), min(max(int(position.y), 0), height - 1)
+        if field[y, x] != UNREACHABLE:
+            return y, x
+        low_y, low_x = max(y - radius, 0), max(x - radius, 0)
+        window = field[low_y:y + radius + 1, low_x:x + radius + 1]
+        ys, xs = numpy.nonzero(window != UNREACHABLE)
+        if len(ys) == 0:
+            return None
+        closest = numpy.argmin((ys + low_y - y) ** 2 + (xs + low_x - x) ** 2)
+        return int(ys[closest]) + low_y, int(xs[closest]) + low_x
+
+    '''
+    The point steps ground steps from position along the path to target, the target itself once it is that close
+    Falls back to the straight line when there is no ground path
+    '''
+    def advance(self, position, target, steps):
+        field = self.field(target)
+        cell = self.reachable_cell(field, position)
+        if cell is None:
+            return position.towards(target, steps)
+
+        y, x = cell
+        for _ in range(int(steps)):
+            if field[y, x] == 0:
+                return target
+            low_y, low_x = max(y - 1, 0), max(x - 1, 0)
+            window = field[low_y:y + 2, low_x:x + 2]
+            # Diagonal steps count as one, so of the neighbors closest to the target by ground the one closest in a
+            # straight line is taken, otherwise the path wanders from side to side
+            ys, xs = numpy.nonzero(window == window[window != UNREACHABLE].min())
+            ys, xs = ys + low_y, xs + low_x
+            closest = numpy.argmin((xs + .5 - target.x) ** 2 + (ys + .5 - target.y) ** 2)
+            y, x = int(ys[closest]), int(xs[closest])
+        if field[y, x] == 0:
+            return target
+        return Point2((x + .5, y + .5))
+
+    def report(self):
+        return "{} flow fields computed in {:0.1f}ms, {} reused".format(self.misses, self.compute_time * 1000, self.hits)
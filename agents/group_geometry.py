@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+import random
+import time
+from itertools import chain
+
+import numpy
+
+
+'''
+Where a group of units is, from one NumPy array of their positions
+The attack and harass strategies ask every step how many units reached the waypoint, which measured the distance of
+each unit in Python. For groups of small_group units or more the positions are read once into an array and the
+distances and centroid are array operations. Building the array costs more than the loop for smaller groups,
+so they are measured unit by unit as before
+'''
+class GroupGeometry():
+    def __init__(self, units, small_group = 20):
+        self.units = list(units)
+        self.is_small = len(self.units) < small_group
+        self._positions = None
+        self._centroid = None
+
+    def __len__(self):
+        return len(self.units)
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            # Point2 is a tuple of x, y, read straight into a flat array
+            self._positions = numpy.fromiter(chain.from_iterable(unit.position.to2 for unit in self.units), dtype=float,
+                                             count=2 * len(self.units)).reshape(-1, 2)
+        return self._positions
+
+    def distances_to(self, point):
+        return numpy.sqrt(numpy.sum((self.positions - (point.x, point.y)) ** 2, axis=1))
+
+    # Fraction of the units closer than radius to point, 0 for an empty group
+    def fraction_within(self, point, radius):
+        if len(self.units) == 0:
+            return 0
+        if self.is_small:
+            return sum(1 for unit in self.units if unit.position.to2.distance_to(point) < radius) / len(self.units)
+        return numpy.count_nonzero(self.distances_to(point) < radius) / len(self.units)
+
+    def farther_than(self, point, radius):
+        if self.is_small:
+            return [unit for unit in self.units if unit.position.to2.distance_to(point) > radius]
+        return [self.units[i] for i in numpy.nonzero(self.distances_to(point) > radius)[0].tolist()]
+
+    # Mean x, y of the units, None for an empty group
+    @property
+    def centroid(self):
+        if len(self.units) == 0:
+            return None
+        if self._centroid is None and self.is_small:
+            self._centroid = numpy.array((sum(unit.position.x for unit in self.units) / len(self.units),
+                                          sum(unit.position.y for unit in self.units) / len(self.units)))
+        elif self._centroid is None:
+            self._centroid = self.positions.mean(axis=0)
+        return self._centroid
+
+
+'''
+Benchmark of what the strategies ask for, the fraction of units at the waypoint for the attacks and also the centroid
+for mutalisk harass, against the per unit loop for groups of 10 to 200 units, building the array included. arrays is GroupGeometry
+with the arrays for every group size
+'''
+if __name__ == '__main__':
+    class Point(tuple):
+        def __new__(cls, x, y):
+            return tuple.__new__(cls, (x, y))
+
+        @property
+        def x(self):
+            return self[0]
+
+        @property
+        def y(self):
+            return self[1]
+
+        @property
+        def to2(self):
+            return Point(self[0], self[1])
+
+        def distance_to(self, other):
+            return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** .5
+
+    class Unit():
+        def __init__(self, x, y):
+            self.position = Point(x, y)
+
+    random.seed(0)
+    waypoint = Point(100, 88)
+    nCalls = 1000
+
+    def loop_attack(units):
+        at_waypoint = 0
+        for unit in units:
+            if unit.position.to2.distance_to(waypoint) < 15:
+                at_waypoint += 1
+        return at_waypoint / len(units)
+
+    def loop_harass(units):
+        center = (sum(unit.position.x for unit in units) / len(units), sum(unit.position.y for unit in units) / len(units))
+        return loop_attack(units), center
+
+    def group_attack(units, small_group):
+        return GroupGeometry(units, small_group).fraction_within(waypoint, 15)
+
+    def group_harass(units, small_group):
+        group = GroupGeometry(units, small_group)
+        return group.fraction_within(waypoint, 15), tuple(group.centroid)
+
+    def flat(result):
+        return numpy.array(result if name == "attack" else (result[0],) + tuple(result[1]), dtype=float)
+
+    # Best of 5 rounds of nCalls, the machine's noise only adds time
+    def timed(function, *args):
+        best = float("inf")
+        for _ in range(5):
+            start = time.perf_counter()
+            for _ in range(nCalls):
+                result = function(*args)
+            best = min(best, time.perf_counter() - start)
+        return result, best / nCalls * 1e6
+
+    for nUnits in (10, 20, 50, 200):
+        units = [Unit(random.gauss(100, 12), random.gauss(88, 12)) for _ in range(nUnits)]
+        for name, loop_version, group_version in (("attack", loop_attack, group_attack), ("harass", loop_harass, group_harass)):
+            expected, looped = timed(loop_version, units)
+            found, grouped = timed(group_version, units, 20)
+            arrays, arrayed = timed(group_version, units, 0)
+            assert numpy.allclose(flat(found), flat(expected)) and numpy.allclose(flat(arrays), flat(expected))
+            print("### {} units, {}: per unit loop {:0.1f}us, arrays {:0.1f}us, group geometry {:0.1f}us".format(
+                nUnits, name, looped, arrayed, grouped))
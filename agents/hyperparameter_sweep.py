@@ -0,0 +1,172 @@
+#!/usr/bin/python3
+'''
+Hyperparameter sweep for the agent and strategy networks and the fused network used by AgentSelector
+Trains every candidate network configuration in its own worker process on recorded decision data,
+ranks the candidates by held-out accuracy and by inference/training latency, and writes the best
+configuration to the selector config that AgentSelector reads when a game starts
+
+Example: python3 hyperparameter_sweep.py -r protoss decisions/protoss_*.dec
+'''
+import argparse
+import itertools
+import multiprocessing
+import time
+
+import numpy
+
+from selector_config import saveNetworkConfig, raceName, normalizeWidth
+from decision_recorder import loadDecisionData, buildTrainingSets
+
+'''
+Fraction of decisions where the network agrees with the recorded outcome
+A correct choice counts when the network would pick the same index, an incorrect choice counts when it would pick another one
+'''
+def choiceAccuracy(predictions, chosen, correct):
+    predictedChoice = numpy.argmax(predictions, axis=1)
+    agrees = numpy.where(correct > .5, predictedChoice == chosen, predictedChoice != chosen)
+    return float(numpy.mean(agrees))
+
+'''
+Trains and evaluates one candidate in a worker process
+Keras is imported inside the worker so every process builds its own session
+'''
+def evaluateCandidate(job):
+    if job[0] == "fused":
+        return evaluateFusedCandidate(job)
+    from NeuralNetwork import NeuralNetwork
+
+    model_type, networkConfig, opponent_race, trainSet, testSet = job
+    trainInputs, trainOutputs, _, _ = trainSet
+    testInputs, testOutputs, testChosen, testCorrect = testSet
+
+    network = NeuralNetwork(trainInputs.shape[1], trainOutputs.shape[1], networkConfig["depth"], networkConfig["width"],
+                            networkConfig["epochs"], opponent_race, model_type, networkConfig["lr"])
+    network.train(trainInputs, trainOutputs)
+
+    predictions = network.predict(testInputs)
+    accuracy = choiceAccuracy(predictions, testChosen, testCorrect)
+    loss = float(numpy.mean((predictions - testOutputs) ** 2))
+
+    # Latency of a single decision, which is how AgentSelector uses the network in game
+    sample = testInputs[:1]
+    network.predict(sample)
+    start = time.perf_counter()
+    for _ in range(20):
+        network.predict(sample)
+    predictLatency = (time.perf_counter() - start) / 20
+
+    start = time.perf_counter()
+    for _ in range(3):
+        network.train(sample, testOutputs[:1])
+    trainLatency = (time.perf_counter() - start) / 3
+
+    return {"model_type": model_type, "config": networkConfig, "accuracy": accuracy, "loss": loss,
+            "predictLatency": predictLatency, "trainLatency": trainLatency}
+
+'''
+Same as evaluateCandidate for the fused network, whose accuracy is the mean of its agent and strategy accuracy
+The strategy head is evaluated on the agent that was chosen in the recorded decision, the way it is trained
+'''
+def evaluateFusedCandidate(job):
+    from FusedNeuralNetwork import FusedNeuralNetwork
+
+    model_type, networkConfig, opponent_race, trainSet, testSet = job
+    trainInputs, trainChosen, trainAgentOutputs, trainStrategyOutputs, _, _, _ = trainSet
+    testInputs, testChosen, testAgentOutputs, testStrategyOutputs, testAgents, testStrategies, testCorrect = testSet
+
+    network = FusedNeuralNetwork(trainInputs.shape[1], trainAgentOutputs.shape[1], trainStrategyOutputs.shape[1],
+                                 networkConfig["depth"], networkConfig["width"], networkConfig["epochs"], opponent_race,
+                                 networkConfig["lr"])
+    network.train(trainInputs, trainChosen, trainAgentOutputs, trainStrategyOutputs)
+
+    agentPredictions, strategyPredictions = network.predict(testInputs, testChosen)
+    accuracy = (choiceAccuracy(agentPredictions, testAgents, testCorrect) +
+                choiceAccuracy(strategyPredictions, testStrategies, testCorrect)) / 2
+    loss = float((numpy.mean((agentPredictions - testAgentOutputs) ** 2) +
+                  numpy.mean((strategyPredictions - testStrategyOutputs) ** 2)) / 2)
+
+    # One decision is one prediction and one training step, as in AgentSelector
+    sample = testInputs[:1]
+    network.predict(sample)
+    start = time.perf_counter()
+    for _ in range(20):
+        network.predict(sample)
+    predictLatency = (time.perf_counter() - start) / 20
+
+    start = time.perf_counter()
+    for _ in range(3):
+        network.train(sample, testChosen[:1], testAgentOutputs[:1], testStrategyOutputs[:1])
+    trainLatency = (time.perf_counter() - start) / 3
+
+    return {"model_type": model_type, "config": networkConfig, "accuracy": accuracy, "loss": loss,
+            "predictLatency": predictLatency, "trainLatency": trainLatency}
+
+'''
+Orders results by held-out accuracy, then by the time one in game decision costs
+Accuracy is rounded so that candidates that are practically as accurate are separated by latency
+'''
+def rankResults(results):
+    return sorted(results, key=lambda result: (-round(result["accuracy"], 2), result["predictLatency"] + result["trainLatency"]))
+
+def readArguments():
+    parser = argparse.ArgumentParser(description="""Sweeps depth, width, epochs and learning rate for the agent, strategy and fused networks -
+     Example: python3 hyperparameter_sweep.py -r protoss decisions/protoss_*.dec""")
+    parser.add_argument("datasets", nargs="+", help="Decision files recorded against one opponent race")
+    parser.add_argument("-r", "--race", help="The opponent race the datasets were recorded against: Terran, Zerg, Protoss", type=str, required=True)
+    parser.add_argument("--depths", help="Comma separated depths to try", type=str, default="1,2,3")
+    parser.add_argument("--widths", help="Comma separated widths to try", type=str, default="0.5,1,2")
+    parser.add_argument("--epochs", help="Comma separated epochs to try", type=str, default="25,100")
+    parser.add_argument("--lrs", help="Comma separated learning rates to try", type=str, default="0.01,0.1,0.5")
+    parser.add_argument("--models", help="Comma separated networks to sweep: agent, strategy, fused", type=str,
+                        default="agent,strategy,fused")
+    parser.add_argument("--holdout", help="Fraction of decisions held out for evaluation", type=float, default=.2)
+    parser.add_argument("-p", "--processes", help="Number of worker processes", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--dry-run", help="Print the ranking without writing the selector config", action="store_true")
+    return parser.parse_args()
+
+def main():
+    args = readArguments()
+    races = {"terran": 1, "zerg": 2, "protoss": 3}
+    if args.race.lower() not in races:
+        raise ValueError("Unknown race: '{}'. Must be terran, zerg, or protoss".format(args.race))
+    opponent_race = races[args.race.lower()]
+
+    trainingSets = buildTrainingSets(loadDecisionData(args.datasets))
+
+    models = args.models.split(",")
+    for model_type in models:
+        if model_type not in trainingSets:
+            raise ValueError("Unknown network: '{}'. Must be agent, strategy, or fused".format(model_type))
+
+    # Shuffle once so every network is evaluated on the same held out decisions
+    nRows = len(trainingSets["agent"][0])
+    order = numpy.random.permutation(nRows)
+    nTest = max(1, int(nRows * args.holdout))
+    testRows, trainRows = order[:nTest], order[nTest:]
+
+    candidates = [{"depth": int(depth), "width": normalizeWidth(width), "epochs": int(epochs), "lr": float(lr)}
+                  for depth, width, epochs, lr in itertools.product(args.depths.split(","), args.widths.split(","),
+                                                                    args.epochs.split(","), args.lrs.split(","))]
+    jobs = []
+    for model_type in models:
+        arrays = trainingSets[model_type]
+        trainSet = tuple(array[trainRows] for array in arrays)
+        testSet = tuple(array[testRows] for array in arrays)
+        jobs.extend((model_type, candidate, opponent_race, trainSet, testSet) for candidate in candidates)
+
+    print("### Sweeping {} candidates on {} decisions ({} held out) with {} processes".format(len(jobs), nRows, nTest, args.processes))
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        results = pool.map(evaluateCandidate, jobs)
+
+    for model_type in models:
+        ranked = rankResults([result for result in results if result["model_type"] == model_type])
+        print("### {} network against {}".format(model_type, raceName(opponent_race)))
+        for result in ranked:
+            print("accuracy {:0.3f} loss {:0.4f} predict {:0.2f}ms train {:0.2f}ms {}".format(
+                result["accuracy"], result["loss"], result["predictLatency"] * 1000, result["trainLatency"] * 1000, result["config"]))
+        if not args.dry_run:
+            saveNetworkConfig(opponent_race, model_type, ranked[0]["config"])
+            print("### Saved {} config {}".format(model_type, ranked[0]["config"]))
+
+if __name__ == '__main__':
+    main()
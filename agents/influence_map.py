@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+import math
+import random
+import time
+
+import numpy
+
+
+GROUND, AIR, HP = 0, 1, 2
+
+# Weapon.TargetType of the game data
+TARGETS_GROUND, TARGETS_AIR, TARGETS_ANY = 1, 2, 3
+
+# Workers hit back when attacked but do not defend anything, harass would keep turning away from them
+WORKER_NAMES = {"SCV", "Probe", "Drone", "MULE"}
+
+THREATS = {}  # Unit type to its ground dps and range and its air dps and range
+
+
+def weapons_threat(weapons, target):
+    weapons = [weapon for weapon in weapons if weapon.type in (target, TARGETS_ANY)]
+    return (sum(weapon.damage * weapon.attacks / weapon.speed for weapon in weapons if weapon.speed > 0),
+            max([weapon.range for weapon in weapons] + [0]))
+
+'''
+Damage per second and range of the weapons of a unit type against ground and against air units, as ground dps, ground
+range, air dps, air range. Structures without weapons have none
+'''
+def unit_threat(unit):
+    if unit.type_id not in THREATS:
+        weapons = unit._type_data._proto.weapons
+        THREATS[unit.type_id] = weapons_threat(weapons, TARGETS_GROUND) + weapons_threat(weapons, TARGETS_AIR)
+    return THREATS[unit.type_id]
+
+def unit_hp(unit):
+    return unit.health + unit.shield
+
+def is_worker(unit):
+    return unit.name in WORKER_NAMES
+
+# Lanchester strength of a group against ground or air units, its damage per second times its hit points
+def group_strength(units, against_air = False):
+    return sum(unit_threat(unit)[2 if against_air else 0] for unit in units) * sum(unit_hp(unit) for unit in units)
+
+
+'''
+Damage per second against ground units, against air units, and hit points of the known enemy units that reach each
+cell of the map
+Each unit adds its dps against ground to the cells within its ground weapon range (plus margin), its dps against air
+to the cells within its air weapon range, and its hp to the cells within either. Workers are left out. Only units
+that appeared, moved to another cell, changed hp or disappeared since the last update are taken out and stamped again,
+so an army standing still costs nothing. What the map shows decays towards what is seen now with the given half life,
+enemies that left vision fade out instead of vanishing. Reading a cell is one array lookup
+'''
+class InfluenceMap():
+    def __init__(self, width, height, cell_size = 2, margin = 2, half_life = 112):
+        self.cell_size = cell_size
+        self.margin = margin  # Added to weapon ranges, units move while they shoot
+        self.half_life = half_life  # Game loops for a remembered threat to halve
+        self.shape = (int(math.ceil(height / cell_size)), int(math.ceil(width / cell_size)))
+
+        self.visible = numpy.zeros((3,) + self.shape)  # Sum of the stamps of the units seen now
+        self.grid = numpy.zeros((3,) + self.shape)  # What is queried, visible plus decayed memory
+        self.stamps = {}  # Unit tag to the cell x, y, and the radius in cells and value of each layer it was stamped with
+        self.discs = {}  # Radius in cells to the mask of the cells within it
+        self.last_loop = None
+
+    def cell(self, x, y):
+        return (min(max(int(y // self.cell_size), 0), self.shape[0] - 1),
+                min(max(int(x // self.cell_size), 0), self.shape[1] - 1))
+
+    def disc(self, radius):
+        if radius not in self.discs:
+            ys, xs = numpy.ogrid[-radius:radius + 1, -radius:radius + 1]
+            self.discs[radius] = (xs ** 2 + ys ** 2 <= radius ** 2).astype(float)
+        return self.discs[radius]
+
+    def stamp(self, stamp, sign):
+        cx, cy = stamp[:2]
+        for layer, (radius, value) in enumerate(zip(stamp[2::2], stamp[3::2])):
+            if value == 0:
+                continue
+            disc = self.disc(radius)
+            low_y, low_x = max(cy - radius, 0), max(cx - radius, 0)
+            high_y, high_x = min(cy + radius + 1, self.shape[0]), min(cx + radius + 1, self.shape[1])
+            window = disc[low_y - cy + radius:high_y - cy + radius, low_x - cx + radius:high_x - cx + radius]
+            self.visible[layer, low_y:high_y, low_x:high_x] += sign * value * window
+
+    def radius(self, reach):
+        return int(math.ceil((reach + self.margin) / self.cell_size))
+
+    '''
+    Takes in the known enemy units of the current step
+    '''
+    def update(self, units, game_loop):
+        stamps = {}
+        for unit in units:
+            if is_worker(unit):
+                continue
+            ground_dps, ground_range, air_dps, air_range = unit_threat(unit)
+            cy, cx = self.cell(unit.position.x, unit.position.y)
+            ground_radius, air_radius = self.radius(ground_range), self.radius(air_range)
+            stamps[unit.tag] = (cx, cy, ground_radius, ground_dps, air_radius, air_dps, max(ground_radius, air_radius),
+                                unit_hp(unit))
+
+        for tag, stamp in self.stamps.items():
+            if stamps.get(tag) != stamp:
+                self.stamp(stamp, -1)
+        for tag, stamp in stamps.items():
+            if self.stamps.get(tag) != stamp:
+                self.stamp(stamp, 1)
+        self.stamps = stamps
+
+        elapsed = 0 if self.last_loop is None else game_loop - self.last_loop
+        self.last_loop = game_loop
+        numpy.maximum(self.grid * .5 ** (elapsed / self.half_life), self.visible, out=self.grid)
+
+    # Enemy dps against a flying or a ground unit at point
+    def dps_at(self, point, is_flying = False):
+        return self.grid[AIR if is_flying else GROUND][self.cell(point.x, point.y)]
+
+    def hp_at(self, point):
+        return self.grid[HP][self.cell(point.x, point.y)]
+
+    # Strength of the enemies reaching point against a group with air_fraction of its hp in the air
+    def strength_at(self, point, air_fraction = 0):
+        cell = self.cell(point.x, point.y)
+        dps = self.grid[GROUND][cell] * (1 - air_fraction) + self.grid[AIR][cell] * air_fraction
+        return dps * self.grid[HP][cell]
+
+    '''
+    x, y of the point distance from origin in a direction within max_angle of target with the least enemy dps against
+    flying or ground units. The straight direction wins ties
+    '''
+    def safest_step(self, origin, target, distance, is_flying = False, max_angle = 60, angle_step = 20):
+        layer = self.grid[AIR if is_flying else GROUND]
+        heading = math.atan2(target.y - origin.y, target.x - origin.x)
+        best, best_dps = None, None
+        for angle in sorted(range(-max_angle, max_angle + 1, angle_step), key=abs):
+            direction = heading + math.radians(angle)
+            x, y = origin.x + math.cos(direction) * distance, origin.y + math.sin(direction) * distance
+            dps = layer[self.cell(x, y)]
+            if best_dps is None or dps < best_dps:
+                best, best_dps = (x, y), dps
+        return best
+
+
+'''
+Benchmark of the per step update at 200 known enemy units on a 200 x 176 map, with all of them new, a quarter of
+them moving, and none moving, and of cell queries. Checks that ground only and air only weapons fill only their layer
+and that workers are left out
+'''
+if __name__ == '__main__':
+    class Point():
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+    class Weapon():
+        def __init__(self, type, damage, attacks, speed, range):
+            self.type, self.damage, self.attacks, self.speed, self.range = type, damage, attacks, speed, range
+
+    class TypeData():
+        def __init__(self, weapons):
+            self._proto = lambda: None
+            self._proto.weapons = weapons
+
+    types = {"Zergling": TypeData([Weapon(TARGETS_GROUND, 5, 1, .497, .1)]),
+             "Roach": TypeData([Weapon(TARGETS_GROUND, 16, 1, 1.43, 4)]),
+             "Hydralisk": TypeData([Weapon(TARGETS_ANY, 12, 1, .59, 5)]),
+             "SpineCrawler": TypeData([Weapon(TARGETS_GROUND, 25, 1, 1.32, 7)]),
+             "SporeCrawler": TypeData([Weapon(TARGETS_AIR, 15, 1, .61, 7)]),
+             "Drone": TypeData([Weapon(TARGETS_GROUND, 5, 1, 1.07, .1)])}
+
+    class Unit():
+        def __init__(self, tag):
+            self.tag = tag
+            self.type_id = self.name = random.choice(list(types))
+            self._type_data = types[self.type_id]
+            self.position = Point(random.random() * 200, random.random() * 176)
+            self.health, self.shield = 100, 0
+
+    random.seed(0)
+    nUnits, nSteps = 200, 200
+    units = [Unit(tag) for tag in range(nUnits)]
+    influence = InfluenceMap(200, 176)
+
+    start = time.perf_counter()
+    influence.update(units, 0)
+    first = time.perf_counter() - start
+
+    def timed(moving):
+        total = 0
+        for step in range(nSteps):
+            for unit in random.sample(units, moving):
+                unit.position = Point(min(max(unit.position.x + random.uniform(-3, 3), 0), 199),
+                                      min(max(unit.position.y + random.uniform(-3, 3), 0), 175))
+            start = time.perf_counter()
+            influence.update(units, (step + 1) * 8)
+            total += time.perf_counter() - start
+        return total / nSteps * 1000
+
+    moving = timed(nUnits // 4)
+    still = timed(0)
+
+    start = time.perf_counter()
+    for point in [Point(random.random() * 200, random.random() * 176) for _ in range(10000)]:
+        influence.dps_at(point)
+    query = (time.perf_counter() - start) / 10000 * 1e6
+
+    # Cells are the sum of the units that reach them, against ground and air separately, workers do not count
+    influence.grid = influence.visible.copy()
+    for unit in units:
+        ground_dps, _, air_dps, _ = unit_threat(unit)
+        if not is_worker(unit):
+            assert influence.dps_at(unit.position) >= ground_dps - 1e-9
+            assert influence.dps_at(unit.position, is_flying=True) >= air_dps - 1e-9
+    assert abs(influence.visible.min()) < 1e-6
+
+    alone = InfluenceMap(200, 176)
+    spore, drone = Unit(0), Unit(1)
+    spore.type_id = spore.name = "SporeCrawler"
+    spore._type_data = types["SporeCrawler"]
+    drone.type_id = drone.name = "Drone"
+    drone._type_data = types["Drone"]
+    drone.position = spore.position
+    alone.update([spore, drone], 0)
+    assert alone.dps_at(spore.position) == 0 and alone.dps_at(spore.position, is_flying=True) > 0
+    print("### {} units: first update {:0.2f}ms, {} moving {:0.2f}ms, none moving {:0.2f}ms per step, {:0.2f}us per cell query".format(
+        nUnits, first * 1000, nUnits // 4, moving, still, query))
@@ -0,0 +1,123 @@
+from sc2.constants import *
+from sc2.data import ActionResult
+
+
+'''
+A unit requested from a larva, err is set once issue has sent the order or when the request was refused
+'''
+class LarvaRequest():
+    def __init__(self, unit_type, larva = None, base = None, err = None):
+        self.unit_type = unit_type
+        self.larva = larva
+        self.base = base
+        self.err = err
+        self.is_done = larva is None  # Refused requests are done right away
+
+    @property
+    def is_ordered(self):
+        return self.is_done and not self.err
+
+    def finish(self, err):
+        self.err = err
+        self.is_done = True
+
+
+'''
+Trains the units asked for from larvae, each larva getting at most one order
+The basic builds and build orders used to pick a random larva for every unit, which could pick the same larva twice
+in a step or a larva that was given an order on the last step and has not turned into an egg yet, and the later order
+then replaced the earlier one. Instead the economy code requests units in priority order through request, which
+takes the next larva of the step for each and reserves its cost in the resource ledger. Larvae are taken from the base
+with the most larvae left, since a base with 3 larvae stops making more. After the step's tasks issue sends the
+orders, one batch of commands per hatchery, and marks each request with the result of its order. Callers that count
+what was trained, like the build orders, check the request after issue instead of counting the request itself
+'''
+class LarvaAllocator():
+    def __init__(self, window_loops = 8):
+        self.window_loops = window_loops  # Game loops a larva that was given an order is not handed out again
+        self.larvae = []  # Larvae without an order at the start of the step
+        self.bases = None
+        self.free = None  # Base tag to its larvae not requested this step, grouped on the first request of a step
+        self.requests = []  # LarvaRequest of the step with a larva, in the order they were requested
+        self.ordered = {}  # Larva tag to the game loop it was given an order on
+
+        # Per game
+        self.orders = 0  # Larva orders sent
+        self.batches = 0  # Requests sent, one per hatchery and step
+        self.withheld = 0  # Larvae still seen as larvae after an order, which would have been ordered again
+        self.refused = 0  # Requests made when every larva already had one this step
+
+    def reset(self, agent):
+        game_loop = agent.state.game_loop
+        self.ordered = {tag: loop for tag, loop in self.ordered.items() if game_loop - loop < self.window_loops}
+        larvae = agent.units(LARVA)
+        self.larvae = [larva for larva in larvae if larva.tag not in self.ordered]
+        self.withheld += len(larvae) - len(self.larvae)
+        self.bases = agent.bases
+        self.free = None
+        self.requests = []
+
+    def base_of(self, larva):
+        return self.bases.closest_to(larva).tag if self.bases.exists else None
+
+    def group(self):
+        self.free = {}
+        for larva in self.larvae:
+            self.free.setdefault(self.base_of(larva), []).append(larva)
+
+    @property
+    def amount(self):
+        return len(self.larvae) - len(self.requests)
+
+    '''
+    Requests a unit_type from the next larva of the step
+    Returns a LarvaRequest, done with the reason when it was refused. Otherwise a larva was set aside for it and its
+    cost taken from the ledger, and issue sends the order after the step's tasks
+    '''
+    def request(self, agent, unit_type):
+        if self.amount <= 0:
+            self.refused += 1
+            return LarvaRequest(unit_type, err=ActionResult.Error)
+        cost = agent.cost_of(unit_type)
+        ledger = agent.resource_ledger
+        if not ledger.can_afford(cost):
+            ledger.blocked += 1
+            return LarvaRequest(unit_type, err=ActionResult.NotEnoughMinerals if cost.minerals > ledger.remaining_minerals
+                                else ActionResult.NotEnoughVespene)
+        if self.free is None:
+            self.group()
+
+        base = max(self.free, key=lambda tag: len(self.free[tag]))
+        # Later can_afford checks of the step see what the request will spend
+        ledger.spend(cost)
+        request = LarvaRequest(unit_type, self.free[base].pop(), base)
+        self.requests.append(request)
+        return request
+
+    '''
+    Sends the requests of the step, one do_group per hatchery, and marks each with the result of its order
+    '''
+    async def issue(self, agent):
+        batches = {}
+        for request in self.requests:
+            batches.setdefault(request.base, []).append(request)
+        self.requests = []
+
+        game_loop = agent.state.game_loop
+        for requests in batches.values():
+            commands = [request.larva.train(request.unit_type) for request in requests]
+            # The costs were taken from the ledger by request
+            err, sent = await agent.do_group(commands, is_paid=True)
+            self.batches += 1
+            self.orders += len(sent)
+            accepted = {command.unit.tag for command in sent}
+            for request in requests:
+                if request.larva.tag in accepted:
+                    self.ordered[request.larva.tag] = game_loop
+                    request.finish(None)
+                else:
+                    request.finish(err or ActionResult.Error)
+
+    def report(self):
+        return "{} larva orders in {} hatchery batches, {} larvae not ordered again while their order was pending, " \
+               "{} requests with every larva taken".format(self.orders, self.batches, self.withheld, self.refused)
@@ -1,6 +1,7 @@
 # https://chatbotslife.com/building-a-basic-pysc2-agent-b109cde1477c
 import asyncio
 import random
+import time
 
 import sc2
 from sc2 import Race, Difficulty
@@ -16,13 +17,29 @@ import sys
 
 # Get strategy enums
 from strategies import Strategies
+from step_scheduler import StepScheduler
+from resource_ledger import ResourceLedger
+from larva_allocator import LarvaAllocator
+from queen_tracker import QueenTracker
+from creep_planner import CreepPlanner
+from building_placement import BuildingPlacement
+from map_analysis import MapAnalysis
+from expansion_planner import ExpansionPlanner
+from spatial_index import StepSpatialIndex
+from group_geometry import GroupGeometry
+from squad_commands import SquadCommands, group_commands, send_commands
+from command_filter import CommandFilter
+from influence_map import InfluenceMap, group_strength, unit_hp
+from flow_field import FlowFields
 
 from sc2.position import Point2
-from sc2.data import race_townhalls
+from sc2.unit import Unit
+from sc2.data import race_townhalls, ActionResult
 
 class LoserAgent(sc2.BotAI):
     mainAgent = None
-    def __init__(self, is_logging = False, is_printing_to_console = False, isMainAgent = False, fileName = ""):
+    def __init__(self, is_logging = False, is_printing_to_console = False, isMainAgent = False, fileName = "", step_budget = 30,
+                 build_frame_skip = 1, use_resource_ledger = True):
         super().__init__()
 
         if isMainAgent:
@@ -145,6 +162,18 @@ class LoserAgent(sc2.BotAI):
             # Top left corner of the map for mutas
             self.map_corner = None
 
+            # Expansions, ramps, grids and ground distances of the map, loaded from its cache file on the first step
+            self.map_analysis = None
+
+            # Expansions by ground distance from the start location and which are taken, see next_expansion
+            self.expansion_planner = None
+
+            # Enemy dps and hp that reach each cell of the map, see harass and attack_with_percentage_of_army
+            self.influence_map = None
+
+            # Ground distance fields towards the targets the army moves to, see attack_with_percentage_of_army
+            self.flow_fields = None
+
             # Set to true after army is requested to prevent duplicate queries in the same iteration
             # gets set to false in each perform_strategy call
             self.is_army_cached = False;
@@ -157,69 +186,119 @@ class LoserAgent(sc2.BotAI):
             # Number of BUILT units, different from number of unit types
             self.creeptumors_built = 0  # number of built creep tumors
             self.creeptumors_built_queen = 0  # number of seed creep tumors built by queens
-            self.drones_built = 0  # number of built drones
-            self.overlords_built = 0  # number of overlords built
-            self.hatcheries_built = 0  # number of hatcheries built
             self.rebuild_viable_tumor = 0  # number of viable tumors rebuilt
-            self.zerglings_built = 0  # number of zerglings built
-            self.queens_built = 0  # number of queens built
-            self.sporecrawlers_built = 0  # number of spore crawlers built
-            self.spinecrawlers_built = 0  # number of spine crawlers built
-            self.drone_gapnum = 0  # gap in missing drones
-            self.drone_gapnumcounter = 0  # counter for replenishing drones
-            self.done_gap_closing = False  # closed gap boolean
-            self.roaches_built = 0  # Number of roaches built
-            self.hydralisks_built = 0  # Number of hydralisks built
-            self.extractors_built = 0  # number of extractors built
-
-            self.queen_gapnum = 0  # gap in missing queens
-            self.queen_gapnumcounter = 0  # counter for replenishing queens
 
             # checks for true/false
             self.base_build_order_complete = False  # checks if base build order is complete
             self.viable_tumor = True  # checks if there's a tumor that can spawn other tumors
-
-            # standard upgrades
-            self.built_gas1 = False
-            self.moved_workers_to_gas1 = False  # whether workers are assigned to the first vespene geyser
-            self.built_sp = False  # whether a spawning pool was built
-            self.research_zmb = False  # whether RESEARCH_ZERGLINGMETABOLICBOOST was performed
-            self.built_rwarren = False  # whether the roach warren was built
-            self.built_lair = False  # True if one Lair has been upgraded
-            self.built_gr = False  # True if glial reconstitution has been built
-            self.built_hd = False  # True if hydralisk den has been built
-            self.built_gs = False  # True if grooved spines are researched
-            self.built_ec = False  # True if evolution chamber is built
-            self.built_ga1 = False  # True if ground armor 1 built
-            self.built_mw1 = False  # True if missile weapon 1 built
+            self.creep_planner = CreepPlanner()  # Creep frontier and the tumors that spread
 
             self.OG_hatchery = 0
 
+            # Milliseconds of each step the economy, army micro, creep spread and bookkeeping tasks may use before
+            # the remaining ones are deferred to a later step
+            self.step_scheduler = StepScheduler(step_budget / 1000)
+
+            # Economy, build order and creep spread run every this many game loops, army micro still runs every step
+            self.build_frame_skip = build_frame_skip
+
+            # Minerals and vespene spent by the commands of the current step, see can_afford and do
+            self.resource_ledger = ResourceLedger(use_resource_ledger)
+            self.ability_costs = {}  # Ability to its cost, see ability_cost
+
+            # Larva requests of the step in priority order, sent per hatchery after the step's tasks, see train_from_larva
+            self.larva_allocator = LarvaAllocator()
+
+            # Nearest, k nearest and radius queries over our units, enemy units and resources, rebuilt every step
+            self.spatial_index = StepSpatialIndex()
+
+            # Attack and move orders for groups of units, sent once per squad and not resent
+            self.squad_commands = SquadCommands()
+
+            # Drops free commands a unit already has or was sent a few loops ago, see do
+            self.command_filter = CommandFilter()
+
+            # Valid building positions near each spot, see build
+            self.building_placement = BuildingPlacement()
+
+            # Queen energy and hatchery injects, see inject_larva
+            self.queen_tracker = QueenTracker()
 
 
     '''
     Base on_step function
     Uses basic_build and performs actions based on the current strategy
-    For now, strategies will change ever 100 steps
     Harass strategies are not implemented yet
+    The work is split into tasks in priority order, the step scheduler defers the later ones when the step runs out of time
     '''
     async def on_step(self, iteration, strategy_num):
         # self.log("Step: %s Overlord: %s" % (str(iteration), str(self.mainAgent.units(OVERLORD).amount)))
         # self.log("Step: " + str(iteration))
 
-        # TEMP: Until strategy is given by Q table
-        #strategy_num = (int)(iteration / 75) % 12
-
-        # Build lings, queen, overlords, drones, and meleeattack1
-        await self.basic_build(iteration)
-
-        # Perform actions based on given strategy
+        # Army data is cached once per step
+        self.mainAgent.is_army_cached = False
+
+        # Map facts are computed once per map and loaded from their cache file on the first step
+        if self.mainAgent.map_analysis is None:
+            start = time.perf_counter()
+            self.mainAgent.map_analysis = MapAnalysis.load(self.mainAgent)
+            self.mainAgent.log("Map analysis {} in {:0.1f}ms".format("loaded" if self.mainAgent.map_analysis.is_cached else "computed",
+                                                                     (time.perf_counter() - start) * 1000))
+            self.mainAgent.expansion_planner = ExpansionPlanner.from_analysis(self.mainAgent.map_analysis,
+                                                                              self.mainAgent.game_info.player_start_location)
+            self.mainAgent.flow_fields = FlowFields(self.mainAgent.map_analysis)
+            self.mainAgent.influence_map = InfluenceMap(self.mainAgent.map_analysis.width, self.mainAgent.map_analysis.height)
+
+        # Spending is tracked from the resources observed this step
+        self.mainAgent.resource_ledger.reset(self.mainAgent.minerals, self.mainAgent.vespene)
+        self.mainAgent.larva_allocator.reset(self.mainAgent)
+        self.mainAgent.spatial_index.reset(self.mainAgent)
+        self.mainAgent.queen_tracker.update(self.mainAgent.state.game_loop, self.mainAgent.units(QUEEN))
+        self.mainAgent.expansion_planner.update(self.mainAgent.bases | self.mainAgent.get_known_enemy_bases())
+        self.mainAgent.influence_map.update(self.mainAgent.known_enemy_units, self.mainAgent.state.game_loop)
+
+        build_period = self.mainAgent.build_frame_skip
+        await self.mainAgent.step_scheduler.run([
+            # Build lings, queen, overlords, drones, and meleeattack1
+            ("economy", lambda: self.basic_build(iteration), build_period),
+            ("army micro", lambda: self.run_strategy(iteration, strategy_num), 0),
+            ("creep spread", lambda: self.spread_creep(iteration), build_period),
+            ("bookkeeping", lambda: self.bookkeeping(iteration), 0)
+        ], self.mainAgent.state.game_loop)
+        await self.mainAgent.larva_allocator.issue(self.mainAgent)
+
+    async def on_end(self, game_result):
+        self.mainAgent.log("Step tasks: " + self.mainAgent.step_scheduler.report())
+        self.mainAgent.log("Commands: " + self.mainAgent.resource_ledger.report())
+        self.mainAgent.log("Larva: " + self.mainAgent.larva_allocator.report())
+        self.mainAgent.log("Queens: " + self.mainAgent.queen_tracker.report())
+        self.mainAgent.log("Creep: " + self.mainAgent.creep_planner.report())
+        self.mainAgent.log("Placement: " + self.mainAgent.building_placement.report())
+        self.mainAgent.log("Squads: " + self.mainAgent.squad_commands.report())
+        self.mainAgent.log("Command filter: " + self.mainAgent.command_filter.report())
+        if self.mainAgent.flow_fields is not None:
+            self.mainAgent.log("Flow fields: " + self.mainAgent.flow_fields.report())
+
+    # Perform actions based on given strategy
+    async def run_strategy(self, iteration, strategy_num):
         if strategy_num == -1:
             # self.mainAgent.log("No given strategy")
             pass
         else:
             await self.perform_strategy(iteration, strategy_num)
 
+    '''
+    Places creep tumors, only agents that spread creep override this
+    '''
+    async def spread_creep(self, iteration):
+        pass
+
+    '''
+    Work that can fall behind for a few steps without hurting the game
+    '''
+    async def bookkeeping(self, iteration):
+        self.mainAgent.clean_strike_force()  # Clear dead units from strike force
+
     '''
     Builds a ton of lings
     Build drones and start gathering vespene
@@ -238,24 +317,24 @@ class LoserAgent(sc2.BotAI):
 
         # Build overlords if close to reaching cap
         if self.mainAgent.supply_used > self.mainAgent.supply_cap - 4 and self.mainAgent.num_larva > 0 and self.mainAgent.can_afford(OVERLORD):
-            await self.mainAgent.do(self.mainAgent.random_larva.train(OVERLORD))
+            await self.mainAgent.train_from_larva(OVERLORD)
         else:
             # Build drones
-            if self.mainAgent.units(DRONE).amount < 20 and self.mainAgent.can_afford(DRONE) and self.mainAgent.units(LARVA).amount > 0 and self.mainAgent.supply_used < self.mainAgent.supply_cap:
-                await self.mainAgent.do(self.mainAgent.random_larva.train(DRONE))
+            if self.mainAgent.units(DRONE).amount < 20 and self.mainAgent.can_afford(DRONE) and self.mainAgent.num_larva > 0 and self.mainAgent.supply_used < self.mainAgent.supply_cap:
+                await self.mainAgent.train_from_larva(DRONE)
 
             if self.mainAgent.units(SPIRE).ready.exists and self.mainAgent.units(MUTALISK).amount < 20 and self.mainAgent.supply_used < self.mainAgent.supply_cap - 3 \
                 and self.mainAgent.can_afford(MUTALISK) and self.mainAgent.num_larva > 0:
-                await self.mainAgent.do(self.mainAgent.random_larva.train(MUTALISK))
+                await self.mainAgent.train_from_larva(MUTALISK)
 
             if self.mainAgent.units(HYDRALISKDEN).ready.exists and self.mainAgent.units(HYDRALISK).amount < 20 and self.mainAgent.supply_used < self.mainAgent.supply_cap - 3 \
                     and self.mainAgent.can_afford(HYDRALISK) and self.mainAgent.num_larva > 0:
-                await self.mainAgent.do(self.mainAgent.random_larva.train(HYDRALISK))
+                await self.mainAgent.train_from_larva(HYDRALISK)
 
             # Build lings
             if self.mainAgent.units(ZERGLING).amount + self.mainAgent.already_pending(ZERGLING) < 5 and self.mainAgent.can_afford(ZERGLING) and self.mainAgent.num_larva > 0 and \
                     self.mainAgent.supply_used < self.mainAgent.supply_cap - 1 and self.mainAgent.units(SPAWNINGPOOL).ready.exists:
-                await self.mainAgent.do(self.mainAgent.random_larva.train(ZERGLING))
+                await self.mainAgent.train_from_larva(ZERGLING)
         # Build Spawning pool
         if not self.mainAgent.units(SPAWNINGPOOL).exists and self.mainAgent.can_afford(SPAWNINGPOOL):
             p = hatchery.position.towards(self.mainAgent.game_info.map_center, 3)
@@ -264,12 +343,12 @@ class LoserAgent(sc2.BotAI):
         if self.mainAgent.units(EXTRACTOR).amount < 2 and self.mainAgent.can_afford(EXTRACTOR) and self.mainAgent.already_pending(EXTRACTOR) < 2:
             self.mainAgent.num_extractors_built += 1
             drone = self.mainAgent.workers.random
-            target = self.mainAgent.state.vespene_geyser.closest_to(drone.position)
+            target = self.mainAgent.spatial_index.geysers.nearest(drone.position)
             await self.mainAgent.do(drone.build(EXTRACTOR, target))
 
         # If Extractor does not have 3 drones, give it more drones
         for extractor in self.mainAgent.units(EXTRACTOR):
-            if extractor.assigned_harvesters < extractor.ideal_harvesters and self.mainAgent.workers.amount > 0:
+            if self.mainAgent.gas_harvesters(extractor) < extractor.ideal_harvesters and self.mainAgent.workers.amount > 0:
                 await self.mainAgent.do(self.mainAgent.workers.random.gather(extractor))
 
         # # Build Evolution Chamber pool
@@ -290,10 +369,7 @@ class LoserAgent(sc2.BotAI):
 
         # Inject larva when possible
         elif self.mainAgent.units(QUEEN).amount > 0:
-            queen = self.mainAgent.units(QUEEN).first
-            abilities = await self.mainAgent.get_available_abilities(queen)
-            if AbilityId.EFFECT_INJECTLARVA in abilities:
-                await self.mainAgent.do(queen(EFFECT_INJECTLARVA, hatchery))
+            await self.mainAgent.inject_larva(self.mainAgent.units(QUEEN).idle)
 
         # Upgrade to lair when possible
         if self.mainAgent.num_lairs_built == 0 and self.mainAgent.units(HATCHERY).amount > 0 and self.mainAgent.can_afford(AbilityId.UPGRADETOLAIR_LAIR) \
@@ -329,8 +405,6 @@ class LoserAgent(sc2.BotAI):
     Strategy functions can be override in base classes
     '''
     async def perform_strategy(self, iteration, strategy_num):
-        self.mainAgent.clean_strike_force()  # Clear dead units from strike force
-        self.mainAgent.is_army_cached = False  # Must re obtain army data
         if self.mainAgent.predicted_enemy_position_num == -1:
             # Initializing things that are needed after game data is loaded
 
@@ -345,8 +419,8 @@ class LoserAgent(sc2.BotAI):
             self.mainAgent.predicted_enemy_position = 0
             self.mainAgent.num_enemy_positions = len(self.mainAgent.enemy_start_locations)
             self.mainAgent.start_location = self.mainAgent.bases.ready.random.position # Should only be 1 hatchery at this time
-            self.mainAgent.map_width = self.mainAgent.game_info.map_size[0]
-            self.mainAgent.map_height = self.mainAgent.game_info.map_size[1]
+            self.mainAgent.map_width = self.mainAgent.map_analysis.width
+            self.mainAgent.map_height = self.mainAgent.map_analysis.height
 
             # Get a point in the corner of the map
             p = lambda: None  # https://stackoverflow.com/questions/19476816/creating-an-empty-object-in-python
@@ -453,32 +527,36 @@ class LoserAgent(sc2.BotAI):
         percentage_units_at_waypoint = \
             await self.move_and_get_percent_units_at_waypoint(army, self.mainAgent.waypoint, True)
 
+        # The waypoint moves along the ground path to the target or back home, not in a straight line over cliffs
+        influence = self.mainAgent.influence_map
+        flow_fields = self.mainAgent.flow_fields
+        # Enemies that reach the waypoint are stronger than the whole army, fall back unless the attack never recalls
+        # Their dps against air counts for the share of the army's hit points in the air
+        air_fraction = sum(unit_hp(unit) for unit in army if unit.is_flying) / max(sum(unit_hp(unit) for unit in army), 1)
+        if percentage_to_retreat_group > 0 and \
+                influence.strength_at(self.mainAgent.waypoint, air_fraction) > group_strength(army):
+            if (self.mainAgent.waypoint != self.mainAgent.start_location):
+                self.mainAgent.waypoint = flow_fields.advance(self.mainAgent.waypoint, self.mainAgent.start_location, 5)
         # If all units are close to the waypoint, pick a closer one
-        if percentage_units_at_waypoint > percentage_to_advance_group:
+        elif percentage_units_at_waypoint > percentage_to_advance_group:
             target = self.mainAgent.select_target()
-            self.mainAgent.waypoint = self.mainAgent.waypoint.towards(target, 20)
+            self.mainAgent.waypoint = flow_fields.advance(self.mainAgent.waypoint, target, 20)
         elif percentage_units_at_waypoint < percentage_to_retreat_group:
             # Move waypoint back
             if (self.mainAgent.waypoint != self.mainAgent.start_location):
-                self.mainAgent.waypoint = self.mainAgent.waypoint.towards(self.mainAgent.start_location, 1)
+                self.mainAgent.waypoint = flow_fields.advance(self.mainAgent.waypoint, self.mainAgent.start_location, 1)
 
 
     async def move_and_get_percent_units_at_waypoint(self, units, waypoint, should_attack):
         # Keep units together
-        num_units_at_waypoint = 0
-        # All strike force members attack to the waypoint
-        for unit in units:
-            distance_from_waypoint = unit.position.to2.distance_to(waypoint)
-            if distance_from_waypoint < 15:
-                num_units_at_waypoint += 1
-
-            if should_attack:
-                await self.mainAgent.do(unit.attack(waypoint))
-            else:
-                await self.mainAgent.do(unit.move(waypoint))
+        percentage_units_at_waypoint = GroupGeometry(units).fraction_within(waypoint, 15)
 
+        # All strike force members attack to the waypoint
+        if should_attack:
+            await self.mainAgent.squad_commands.attack(self.mainAgent, units, waypoint)
+        else:
+            await self.mainAgent.squad_commands.move(self.mainAgent, units, waypoint)
 
-        percentage_units_at_waypoint = num_units_at_waypoint / len(units)
         return percentage_units_at_waypoint
 
     '''
@@ -570,9 +648,8 @@ class LoserAgent(sc2.BotAI):
 
         # TODO: have some units go to expansions
         # Return all units to base
-        for unit in self.mainAgent.army + self.mainAgent.overlords:
-            if unit.distance_to(hatchery.position) > 20:
-                await self.mainAgent.do(unit.move(hatchery.position))
+        away = GroupGeometry(self.mainAgent.army + self.mainAgent.overlords).farther_than(hatchery.position, 20)
+        await self.mainAgent.squad_commands.move(self.mainAgent, away, hatchery.position)
 
 
         # Build spine crawlers
@@ -646,28 +723,44 @@ class LoserAgent(sc2.BotAI):
         if mutalisks.amount > 0:
             if self.mainAgent.mutalisk_waypoint == self.mainAgent.enemy_start_locations[0]:
                 # Second phase of muta harass, when at the enemy base, begin attacking
-                for muta in mutalisks:
-                    if muta.position.to2.distance_to(self.mainAgent.mutalisk_waypoint):
-                        # Begin attacking workers or anything nearby
-                        await self.mainAgent.do(muta.attack(harass_target))
-                    else:
-                        # Move to whre the workers are without attacking
-                        await self.mainAgent.do(muta.move(self.mainAgent.mutalisk_waypoint))
+                attacking = [muta for muta in mutalisks if muta.position.to2.distance_to(self.mainAgent.mutalisk_waypoint)]
+                # Begin attacking workers or anything nearby
+                await self.mainAgent.squad_commands.attack(self.mainAgent, attacking, harass_target)
+                # Move to whre the workers are without attacking
+                await self.mainAgent.squad_commands.move(self.mainAgent, mutalisks.tags_not_in({muta.tag for muta in attacking}),
+                                                         self.mainAgent.mutalisk_waypoint)
             else:
                 # Phase 1: Gather the mutas
-                # Move mutalisks to mutalisk waypoint, and do not attack anything else on the way
-                percentage_mutas_at_waypoint = await \
-                    self.move_and_get_percent_units_at_waypoint(mutalisks, self.mainAgent.mutalisk_waypoint, False)
+                # Move mutalisks to mutalisk waypoint around enemy defenses, and do not attack anything else on the way
+                group = GroupGeometry(mutalisks)
+                percentage_mutas_at_waypoint = group.fraction_within(self.mainAgent.mutalisk_waypoint, 15)
+                route = self.harass_route(Point2(tuple(group.centroid)), self.mainAgent.mutalisk_waypoint, is_flying=True)
+                await self.mainAgent.squad_commands.move(self.mainAgent, mutalisks, route)
                 if percentage_mutas_at_waypoint > .75:
                     self.mainAgent.mutalisk_waypoint = self.mainAgent.enemy_start_locations[0]  # Send them off to the enemy base
 
-        for unit in self.army - self.mainAgent.units(MUTALISK):
-            if unit.health < unit.health_max * percent_health_to_return:
-                # low on health so come back
-                await self.mainAgent.do(unit.move(self.mainAgent.bases.random))
-            else:
-                # still full health so keep attacking
-                await self.mainAgent.do(unit.attack(harass_target))
+        others = self.army - self.mainAgent.units(MUTALISK)
+        # low on health, or enemies around would kill it within a second, so come back
+        influence = self.mainAgent.influence_map
+        returning = others.filter(lambda unit: unit.health < unit.health_max * percent_health_to_return or
+                                  (percent_health_to_return > 0 and influence.dps_at(unit.position, unit.is_flying) > unit_hp(unit)))
+        if returning.exists:
+            await self.mainAgent.squad_commands.move(self.mainAgent, returning, self.mainAgent.bases.random)
+        # still full health so keep attacking
+        await self.mainAgent.squad_commands.attack(self.mainAgent, others.tags_not_in(returning.tags), harass_target)
+
+    '''
+    Where a harass group at position moves next on its way to waypoint
+    Straight to the waypoint while no known enemy that can hit the group reaches the next 10 units of the way,
+    otherwise 10 units in the direction with the least enemy dps against flying or ground units
+    '''
+    def harass_route(self, position, waypoint, is_flying = False, step = 10):
+        if position.distance_to(waypoint) <= step:
+            return waypoint
+        influence = self.mainAgent.influence_map
+        if influence.dps_at(position.towards(waypoint, step), is_flying) == 0:
+            return waypoint
+        return Point2(influence.safest_step(position, waypoint, step, is_flying))
 
     # Finds a target to harass
     # Will first choose workers, and if there are no workers, then to go a known base, and in no known bases,
@@ -676,9 +769,9 @@ class LoserAgent(sc2.BotAI):
         # If there are known enemy expansions, harass those
         enemy_workers = self.mainAgent.known_enemy_units.filter(lambda x: x.name == "Drone" or x.name == "SCV" or x.name == "Probe")
 
-        # If workers are visible, attack them
+        # If workers are visible, attack the least defended
         if len(enemy_workers) > 0:
-            harass_target = enemy_workers.random.position
+            harass_target = min(enemy_workers, key=lambda worker: self.mainAgent.influence_map.dps_at(worker.position)).position
         else:
             # If no workers are visible, find a town hall to attack
             enemy_bases = self.get_known_enemy_bases()
@@ -712,12 +805,12 @@ class LoserAgent(sc2.BotAI):
             return self.mainAgent.cached_army
         else:
             self.mainAgent.is_army_cached = True
-            self.cached_army = self.mainAgent.units.filter(
+            self.mainAgent.cached_army = self.mainAgent.units.filter(
                 lambda x: x.name != "Drone" and x.name != "Overlord" and x.name != "Queen" and x.name != "CreepTumorQueen"\
                           and x.name != "Egg" and x.name != "Larva" and not x.is_structure and x.name != "CreepTumorBurrowed") \
                             - self.mainAgent.units(LURKERMPBURROWED) - self.mainAgent.units(LURKERMPEGG) \
                             - self.mainAgent.units(BANELINGCOCOON)
-            return self.cached_army
+            return self.mainAgent.cached_army
 
     @property
     def overlords(self):
@@ -775,15 +868,144 @@ class LoserAgent(sc2.BotAI):
         #
         # return self.enemy_start_locations[self.predicted_enemy_position]
 
+    '''
+    Resource ledger
+    can_afford also checks what the commands already issued this step have spent, do and build drop the commands
+    the step can no longer pay for instead of sending them to the game
+    '''
+    def cost_of(self, item_id):
+        if isinstance(item_id, UnitTypeId):
+            return self.ability_cost(self._game_data.units[item_id.value].creation_ability)
+        elif isinstance(item_id, UpgradeId):
+            return self._game_data.upgrades[item_id.value].cost
+        else:
+            return self.ability_cost(item_id)
+
+    # calculate_ability_cost looks through every unit type and upgrade, costs do not change during a game
+    def ability_cost(self, ability):
+        costs = self.mainAgent.ability_costs
+        if ability not in costs:
+            costs[ability] = self._game_data.calculate_ability_cost(ability)
+        return costs[ability]
+
+    def can_afford(self, item_id):
+        return super().can_afford(item_id) and self.mainAgent.resource_ledger.can_afford(self.cost_of(item_id))
+
+    async def do(self, action):
+        err, _ = await self.do_group([action])
+        return err
+
+    '''
+    Every command goes through here, alone from do or many at once from the squads and the larva allocator
+    Free commands that would not change what their unit does are dropped by the command filter, the ledger pays for the
+    others in the order given and drops the ones the step can no longer pay for. What is left is sent in one request,
+    with one command for all the units that share an ability and a target
+    is_paid is for commands whose cost was already taken from the ledger, they are only refunded if the game rejects them
+    Returns the first error or None, and the commands the game accepted
+    '''
+    async def do_group(self, actions, is_paid = False):
+        ledger = self.mainAgent.resource_ledger
+        command_filter = self.mainAgent.command_filter
+        game_loop = self.state.game_loop
+
+        err = None
+        sent = []
+        for action in actions:
+            cost = self.ability_cost(action.ability)
+            is_free = cost.minerals == 0 and cost.vespene == 0
+            # A free command the unit already follows changes nothing
+            if is_free and command_filter.is_redundant(action, game_loop):
+                continue
+            if not is_paid:
+                if not ledger.can_afford(cost):
+                    ledger.blocked += 1
+                    err = err or (ActionResult.NotEnoughMinerals if cost.minerals > ledger.remaining_minerals else ActionResult.NotEnoughVespene)
+                    continue
+                ledger.spend(cost)
+            sent.append((action, cost, is_free))
+        if not sent:
+            return err, []
+
+        ledger.commands += len(sent)
+        if len(sent) == 1:
+            results = [(await super().do(sent[0][0]), [sent[0]])]
+        else:
+            groups = group_commands(sent, key=lambda item: item[0])
+            errors = await send_commands(self._client, [[item[0] for item in group] for group in groups])
+            results = list(zip(errors, groups))
+
+        accepted = []
+        for group_err, group in results:
+            if group_err:
+                err = err or group_err
+                ledger.rejected += len(group)
+                for _, cost, _ in group:
+                    ledger.refund(cost)
+            else:
+                for action, _, is_free in group:
+                    accepted.append(action)
+                    if is_free:
+                        command_filter.record(action, game_loop)
+                    else:
+                        command_filter.forget(action)
+        return err, accepted
+
+    '''
+    Workers on the extractor, counting the ones sent to it in the last few loops that assigned_harvesters does not show yet
+    '''
+    def gas_harvesters(self, extractor):
+        return extractor.assigned_harvesters + \
+            self.mainAgent.command_filter.recent(AbilityId.HARVEST_GATHER, extractor, self.mainAgent.state.game_loop)
+
+    '''
+    Same as BotAI.build, but the position comes from the building placement cache, one batched query per spot
+    The ledger is checked before the placement query, which is a round trip of its own
+    '''
+    async def build(self, building, near, max_distance = 20, unit = None, placement_step = 2):
+        if not self.can_afford(building):
+            self.mainAgent.resource_ledger.blocked += 1
+            return ActionResult.NotEnoughMinerals
+
+        placement = self.mainAgent.building_placement
+        near = near.position.to2 if isinstance(near, Unit) else near.to2
+        position = await placement.find(self, building, near, max_distance, placement_step)
+        if position is None:
+            return ActionResult.CantFindPlacementLocation
+        unit = unit or self.select_build_worker(position)
+        if unit is None:
+            return ActionResult.Error
+
+        err = await self.do(unit.build(building, position))
+        if err:
+            placement.reject(building, self, near, position)
+        else:
+            placement.claim(building, self, position)
+        return err
+
+    '''
+    Injects the ready bases whose inject is about to run out with the closest of queens that has the energy for it
+    The queen tracker knows the energy and the injects, so no abilities are asked from the game
+    '''
+    async def inject_larva(self, queens):
+        tracker = self.mainAgent.queen_tracker
+        for queen, hatchery in tracker.plan_injects(self.mainAgent.state.game_loop, queens, self.mainAgent.bases.ready):
+            err = await self.mainAgent.do(queen(EFFECT_INJECTLARVA, hatchery))
+            if err:
+                tracker.cancel_inject(queen, hatchery)
+
+    # The closest free expansion by ground, from the expansion planner instead of get_next_expansion
+    def next_expansion(self):
+        return self.mainAgent.expansion_planner.next()
+
     @property
     def num_larva(self):
-        """Get the current amount of larva"""
-        return self.mainAgent.units(LARVA).amount
+        """Get the current amount of larva without an order this step"""
+        return self.mainAgent.larva_allocator.amount
 
-    @property
-    def random_larva(self):
-        """Get a random larva"""
-        return self.mainAgent.units(LARVA).random
+    async def train_from_larva(self, unit_type):
+        """Request unit_type from a larva that has no order yet this step, the order is sent after the step's tasks
+        Returns the LarvaRequest, whose is_ordered tells once the step is over whether the unit was ordered"""
+        return self.mainAgent.larva_allocator.request(self.mainAgent, unit_type)
 
     '''
     Prints to console if self.is_printing_to_console
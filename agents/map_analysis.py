@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+from collections import deque
+
+import numpy
+
+from sc2.position import Point2
+
+from pixel_map import pixel_map_array, check_orientation
+
+
+MAP_CACHE_DIRECTORY = "./maps"
+
+# Layers of the grid file, the ground distance from each start location follows them
+PATHING, PLACEMENT, CLEARANCE, DISTANCES = 0, 1, 2, 3
+
+UNREACHABLE = -1
+
+
+'''
+Identifies a map by its name, size and grids, so an edited map with the same name gets its own cache
+'''
+def map_hash(game_info):
+    digest = hashlib.sha1(game_info.map_name.encode())
+    digest.update(str(tuple(game_info.map_size)).encode())
+    digest.update(game_info.pathing_grid._proto.data)
+    digest.update(game_info.placement_grid._proto.data)
+    return digest.hexdigest()[:16]
+
+# Cells next to mask, diagonals included
+def dilate(mask):
+    grown = mask.copy()
+    grown[1:, :] |= mask[:-1, :]
+    grown[:-1, :] |= mask[1:, :]
+    grown[:, 1:] |= grown[:, :-1].copy()
+    grown[:, :-1] |= grown[:, 1:].copy()
+    return grown
+
+# The pathable cells within radius of position, a unit there can walk from them
+def cells_near(pathable, position, radius = 6):
+    ys, xs = numpy.ogrid[:pathable.shape[0], :pathable.shape[1]]
+    return pathable & ((xs + .5 - position[0]) ** 2 + (ys + .5 - position[1]) ** 2 <= radius ** 2)
+
+'''
+Steps over pathable cells from the cells of start, diagonal steps count as one
+'''
+def ground_distances(pathable, start):
+    distances = numpy.full(pathable.shape, UNREACHABLE, dtype=numpy.int16)
+    frontier = start & pathable
+    reached = frontier.copy()
+    step = 0
+    while frontier.any():
+        distances[frontier] = step
+        frontier = dilate(frontier) & pathable & ~reached
+        reached |= frontier
+        step += 1
+    return distances
+
+# Number of times a cell survives shrinking the pathable area by one cell, its distance to the nearest wall
+def clearance(pathable, most = 16):
+    result = numpy.zeros(pathable.shape, dtype=numpy.int16)
+    area = pathable.copy()
+    for _ in range(most):
+        result += area
+        area = ~dilate(~area)
+        if not area.any():
+            break
+    return result
+
+'''
+Groups of pathable cells that cannot be built on and lie between buildable ground, ramps for ground units
+'''
+def find_ramps(pathable, placement, clearances, smallest = 8):
+    ramp = pathable & ~placement & dilate(placement)
+    seen = numpy.zeros(ramp.shape, dtype=bool)
+    ramps = []
+    for y, x in zip(*numpy.nonzero(ramp)):
+        if seen[y, x]:
+            continue
+        cells = []
+        queue = deque([(y, x)])
+        seen[y, x] = True
+        while queue:
+            cy, cx = queue.popleft()
+            cells.append((cy, cx))
+            for ny in range(max(cy - 1, 0), min(cy + 2, ramp.shape[0])):
+                for nx in range(max(cx - 1, 0), min(cx + 2, ramp.shape[1])):
+                    if ramp[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        queue.append((ny, nx))
+        if len(cells) >= smallest:
+            ys, xs = numpy.array(cells).T
+            ramps.append({"center": [float(xs.mean()) + .5, float(ys.mean()) + .5], "size": len(cells),
+                          "width": int(clearances[ys, xs].max()) * 2})
+    return ramps
+
+
+'''
+What the agents need to know about a map, computed once per map and kept in MAP_CACHE_DIRECTORY
+The grids (pathing, placement, clearance and the ground distance from every start location) are one int16 NumPy
+file that is memory mapped when a game starts, the expansions, ramps, chokes and start to start distances are a
+small JSON file next to it. A later game on the same map only hashes the map and maps the file
+'''
+class MapAnalysis():
+    def __init__(self, grids, info):
+        self.grids = grids
+        self.info = info
+        self.start_locations = [Point2(tuple(location)) for location in info["start_locations"]]
+        self.expansions = [Point2(tuple(location)) for location in info["expansions"]]
+        self.ramps = info["ramps"]
+        self.chokes = [Point2(tuple(ramp["center"])) for ramp in info["ramps"] if ramp["width"] <= info["choke_width"]]
+
+    @property
+    def width(self):
+        return self.grids.shape[2]
+
+    @property
+    def height(self):
+        return self.grids.shape[1]
+
+    @property
+    def pathing(self):
+        return self.grids[PATHING] != 0
+
+    @property
+    def placement(self):
+        return self.grids[PLACEMENT] != 0
+
+    def start_index(self, location):
+        return min(range(len(self.start_locations)), key=lambda i: self.start_locations[i].distance_to(location))
+
+    # Ground distance field from the start location closest to location
+    def distances_from(self, location):
+        return self.grids[DISTANCES + self.start_index(location)]
+
+    def start_distance(self, start, other):
+        return self.info["start_distances"][self.start_index(start)][self.start_index(other)]
+
+    # Ground distance from each start location to each expansion, in the order of expansions
+    def expansion_distances(self, start):
+        return self.info["expansion_distances"][self.start_index(start)]
+
+    @classmethod
+    def analyze(cls, agent, choke_width = 6):
+        game_info = agent.game_info
+        pathable = pixel_map_array(game_info.pathing_grid)
+        placement = pixel_map_array(game_info.placement_grid)
+        if not check_orientation(game_info.placement_grid, placement):
+            agent.log("Placement grid array does not match PixelMap indexing, map positions may be flipped")
+        # Older game versions report the pathing grid inverted, buildable ground is always pathable
+        if numpy.count_nonzero(placement & pathable) < numpy.count_nonzero(placement & ~pathable):
+            pathable = ~pathable
+        pathable |= placement
+        clearances = clearance(pathable)
+
+        start_locations = [game_info.player_start_location] + list(game_info.start_locations)
+        start_locations = sorted(tuple(location) for location in start_locations)
+        distances = [ground_distances(pathable, cells_near(pathable, location)) for location in start_locations]
+
+        def distance_to(field, location):
+            near = field[cells_near(pathable, location, 4)]
+            near = near[near != UNREACHABLE]
+            return int(near.min()) if near.size else UNREACHABLE
+
+        expansions = sorted(tuple(location) for location in agent.expansion_locations)
+        grids = numpy.stack([pathable, placement, clearances] + distances).astype(numpy.int16)
+        info = {
+            "map_name": game_info.map_name,
+            "start_locations": [list(location) for location in start_locations],
+            "expansions": [list(location) for location in expansions],
+            "ramps": find_ramps(pathable, placement, clearances),
+            "choke_width": choke_width,
+            "start_distances": [[distance_to(field, location) for location in start_locations] for field in distances],
+            "expansion_distances": [[distance_to(field, location) for location in expansions] for field in distances]
+        }
+        return grids, info
+
+    '''
+    Maps the cached analysis of the current map, analyzing it and writing the cache the first time
+    '''
+    @classmethod
+    def load(cls, agent, directory = MAP_CACHE_DIRECTORY):
+        key = map_hash(agent.game_info)
+        grids_file = os.path.join(directory, key + ".npy")
+        info_file = os.path.join(directory, key + ".json")
+        is_cached = os.path.exists(grids_file) and os.path.exists(info_file)
+        if not is_cached:
+            grids, info = cls.analyze(agent)
+            # Make maps directory if it doesn't exist
+            if not os.path.exists(directory):
+                os.mkdir(directory)
+            numpy.save(grids_file, grids)
+            with open(info_file, "w") as infoFile:
+                json.dump(info, infoFile)
+
+        with open(info_file) as infoFile:
+            info = json.load(infoFile)
+        analysis = cls(numpy.load(grids_file, mmap_mode="r"), info)
+        analysis.is_cached = is_cached
+        return analysis
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+'''
+Pretrains the agent and strategy networks on recorded decision files instead of learning one sample at a time in game
+Files are grouped by the opponent race in their header and streamed through memory maps in large batches, so the
+recorded data never has to fit in memory. Weights are saved to the same files AgentSelector loads with NeuralNetwork.loadWeights
+
+Example: python3 offline_trainer.py decisions/*.dec
+'''
+import argparse
+import random
+from collections import defaultdict
+
+import numpy
+
+from NeuralNetwork import NeuralNetwork
+from decision_recorder import readHeader, readDecisionFile, splitColumns, buildTrainingSets
+from selector_config import loadNetworkConfig, raceName
+
+'''
+Yields training sets built from batchRows decisions at a time
+Rows are read from the memory mapped files in order, gathered across files until the batch is full, then shuffled
+'''
+def iterateBatches(paths, batchRows):
+    pending = []
+    pendingRows = 0
+    header = None
+    for path in paths:
+        header, rows = readDecisionFile(path)
+        start = 0
+        while start < len(rows):
+            chunk = rows[start:start + batchRows - pendingRows]
+            pending.append(numpy.array(chunk))
+            pendingRows += len(chunk)
+            start += len(chunk)
+            if pendingRows == batchRows:
+                yield buildShuffledSets(header, pending)
+                pending = []
+                pendingRows = 0
+    if pendingRows > 0:
+        yield buildShuffledSets(header, pending)
+
+def buildShuffledSets(header, chunks):
+    rows = numpy.concatenate(chunks)
+    rows = rows[numpy.random.permutation(len(rows))]
+    return buildTrainingSets(splitColumns(header, rows))
+
+'''
+Groups decision files by opponent race and checks that every file of a race uses the same inputs
+'''
+def groupByRace(paths):
+    groups = defaultdict(list)
+    schemas = {}
+    for path in paths:
+        header, _ = readHeader(path)
+        schema = (header["nInputs"], header["nAgents"], header["nStrategies"])
+        race = header["opponent_race"]
+        if race in schemas and schemas[race] != schema:
+            raise ValueError("{} does not match the inputs of the other {} files".format(path, raceName(race)))
+        schemas[race] = schema
+        groups[race].append(path)
+    return groups, schemas
+
+'''
+Builds the networks the same way AgentSelector.setupInputs does so the saved weights load in game
+'''
+def buildNetworks(opponent_race, nInputs, nAgents, nStrategies):
+    agentConfig = loadNetworkConfig(opponent_race, "agent")
+    agentNN = NeuralNetwork(nInputs + nAgents + nStrategies, nAgents, agentConfig["depth"], agentConfig["width"],
+                            agentConfig["epochs"], opponent_race, "agent", agentConfig["lr"])
+    strategyConfig = loadNetworkConfig(opponent_race, "strategy")
+    strategyNN = NeuralNetwork(nInputs + 2 * nAgents + nStrategies, nStrategies, strategyConfig["depth"], strategyConfig["width"],
+                               strategyConfig["epochs"], opponent_race, "strategy", strategyConfig["lr"])
+    return {"agent": agentNN, "strategy": strategyNN}
+
+def train(paths, opponent_race, schema, epochs, batchRows, batchSize, resume):
+    networks = buildNetworks(opponent_race, *schema)
+    if resume:
+        for network in networks.values():
+            network.loadWeights()
+
+    for epoch in range(epochs):
+        random.shuffle(paths)
+        losses = defaultdict(list)
+        nRows = 0
+        for trainingSets in iterateBatches(paths, batchRows):
+            for model_type, network in networks.items():
+                inputs, outputs, _, _ = trainingSets[model_type]
+                losses[model_type].append(network.trainBatch(inputs, outputs, batchSize))
+            nRows += len(trainingSets["agent"][0])
+        print("### {} epoch {}: {} decisions, agent loss {:0.4f}, strategy loss {:0.4f}".format(
+            raceName(opponent_race), epoch + 1, nRows, numpy.mean(losses["agent"]), numpy.mean(losses["strategy"])))
+
+    for network in networks.values():
+        network.saveWeights()
+        print("### Saved " + network.fileName)
+
+def readArguments():
+    parser = argparse.ArgumentParser(description="""Trains the agent and strategy networks on recorded decision files -
+     Example: python3 offline_trainer.py decisions/*.dec""")
+    parser.add_argument("datasets", nargs="+", help="Recorded decision files, any opponent race")
+    parser.add_argument("-e", "--epochs", help="Passes over the recorded decisions", type=int, default=20)
+    parser.add_argument("--batch-rows", help="Decisions read from disk per training call", type=int, default=65536)
+    parser.add_argument("--batch-size", help="Minibatch size for each gradient step", type=int, default=256)
+    parser.add_argument("--resume", help="Continue from the saved weights instead of starting over", action="store_true")
+    return parser.parse_args()
+
+def main():
+    args = readArguments()
+    groups, schemas = groupByRace(args.datasets)
+    for opponent_race, paths in groups.items():
+        train(paths, opponent_race, schemas[opponent_race], args.epochs, args.batch_rows, args.batch_size, args.resume)
+
+if __name__ == '__main__':
+    main()
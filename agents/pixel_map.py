@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+import random
+
+import numpy
+
+
+'''
+Reads a PixelMap of the game (creep, pathing and placement grids, visibility) into a NumPy array of its values indexed
+[y, x], the same cell as PixelMap[(x, y)]
+'''
+def pixel_map_values(pixel_map):
+    image = pixel_map._proto
+    data = numpy.frombuffer(image.data, dtype=numpy.uint8)
+    if image.bits_per_pixel == 1:
+        data = numpy.unpackbits(data)
+    return data[:image.size.x * image.size.y].reshape(image.size.y, image.size.x)
+
+# Same as pixel_map_values, true where the map is set
+def pixel_map_array(pixel_map):
+    return pixel_map_values(pixel_map) != 0
+
+'''
+True if values, from pixel_map_values, agrees with PixelMap[(x, y)] on samples cells picked at random
+PixelMap has flipped y in some versions of python-sc2, which would put everything read from the arrays on the wrong
+side of the map
+'''
+def check_orientation(pixel_map, values, samples = 64):
+    height, width = values.shape
+    for _ in range(samples):
+        x, y = random.randrange(width), random.randrange(height)
+        if (values[y, x] != 0) != (pixel_map[(x, y)] != 0):
+            return False
+    return True
+
+
+'''
+Checks pixel_map_values against a stand-in PixelMap that indexes its data the way python-sc2 does, row y and column
+x from the start of the data, for 8 and 1 bits per pixel on a map that is not square
+'''
+if __name__ == '__main__':
+    class Proto():
+        pass
+
+    class PixelMap():
+        def __init__(self, grid, bits_per_pixel):
+            self.grid = grid
+            self._proto = Proto()
+            self._proto.size = Proto()
+            self._proto.size.x, self._proto.size.y = grid.shape[1], grid.shape[0]
+            self._proto.bits_per_pixel = bits_per_pixel
+            flat = grid.flatten()
+            self._proto.data = (numpy.packbits(flat != 0) if bits_per_pixel == 1 else flat).astype(numpy.uint8).tobytes()
+
+        def __getitem__(self, pos):
+            x, y = pos
+            index = self.grid.shape[1] * y + x
+            if self._proto.bits_per_pixel == 1:
+                return (self._proto.data[index // 8] >> (7 - index % 8)) & 1
+            return self._proto.data[index]
+
+    random.seed(0)
+    grid = numpy.random.randint(0, 3, size=(37, 53)).astype(numpy.uint8)
+    for bits in (8, 1):
+        pixel_map = PixelMap(grid if bits == 8 else grid % 2, bits)
+        values = pixel_map_values(pixel_map)
+        assert values.shape == (37, 53)
+        assert all(values[y, x] == pixel_map[(x, y)] for y in range(37) for x in range(53))
+        assert check_orientation(pixel_map, values)
+        assert not check_orientation(pixel_map, values[::-1])
+    print("### pixel_map_values matches PixelMap[(x, y)] at 8 and 1 bits per pixel")
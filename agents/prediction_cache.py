@@ -0,0 +1,74 @@
+from collections import OrderedDict
+import time
+
+import numpy
+
+
+'''
+LRU cache of network outputs for AgentSelector decisions
+Between decisions create_inputs() often barely changes, so the inputs are quantized and combined with the
+previous agent and strategy into a key. A key that was already seen returns the stored outputs instead of running
+the networks again. Entries are tied to the weight version of the networks and are dropped when the weights change
+'''
+class PredictionCache():
+    def __init__(self, capacity = 256, levels = 200):
+        self.capacity = capacity
+
+        # Inputs are unit counts / 200 and resources / 1000, so 200 levels keeps unit counts exact
+        # and merges resource amounts that are within 5 of each other
+        self.levels = levels
+
+        self.entries = OrderedDict()
+        self.version = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.missTime = 0  # Seconds spent computing the outputs of every miss
+
+    def key(self, inputs, agentIndex, strategyIndex):
+        quantized = numpy.round(numpy.asarray(inputs, dtype=numpy.float64) * self.levels).astype(numpy.int32)
+        return quantized.tobytes(), agentIndex, strategyIndex
+
+    '''
+    Returns the cached outputs for key, or computes them with compute() and stores them
+    version identifies the network weights the outputs came from
+    '''
+    def get(self, key, version, compute):
+        if version != self.version:
+            if self.entries:
+                self.invalidations += 1
+            self.entries.clear()
+            self.version = version
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        start = time.perf_counter()
+        outputs = compute()
+        self.missTime += time.perf_counter() - start
+        self.misses += 1
+
+        self.entries[key] = outputs
+        if len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)  # Evict the least recently used entry
+        return outputs
+
+    @property
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0
+
+    @property
+    def savedTime(self):
+        """Estimated seconds of inference saved, using the average time of a miss for every hit"""
+        if self.misses == 0:
+            return 0
+        return self.hits * self.missTime / self.misses
+
+    def metrics(self):
+        return {"hits": self.hits, "misses": self.misses, "hitRate": self.hitRate, "invalidations": self.invalidations,
+                "savedTime": self.savedTime}
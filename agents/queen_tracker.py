@@ -0,0 +1,176 @@
+#!/usr/bin/python3
+import random
+
+
+'''
+Local model of queen energy and larva injects, so queens are only ordered to cast what will succeed
+The agents asked the game for each idle queen's available abilities before every inject or tumor, one round trip per
+queen per step. The tracker reads unit.energy instead, keeps the energy of orders that have not been cast yet reserved,
+and knows when the inject on each hatchery runs out, so injects are spread over the hatcheries and a hatchery only
+gets the next inject when its current one is about to end (injects queue on a hatchery)
+'''
+class QueenTracker():
+    INJECT_ENERGY = 25
+    TUMOR_ENERGY = 25
+    INJECT_LOOPS = 650  # 29 seconds of larva spawning per inject
+    ENERGY_PER_LOOP = .7875 / 22.4
+    RESERVATION_LOOPS = 224  # An idle queen that has not cast its order after this long dropped it
+
+    def __init__(self, inject_lead = 45):
+        self.inject_lead = inject_lead  # Game loops before an inject ends that the next one is ordered, for the walk
+        self.reserved = {}  # Queen tag to (energy reserved, energy when ordered, game loop when ordered)
+        self.inject_until = {}  # Hatchery tag to the game loop its injects run out
+
+        # Per game
+        self.injects = 0
+        self.tumors = 0
+        self.queries_avoided = 0  # Ability queries the agents would have made, one per queen passed to plan_injects
+
+    '''
+    Drops the reservations of queens that cast their order (their energy fell below what it was when ordered),
+    of queens that died and of idle queens whose order was never cast
+    '''
+    def update(self, game_loop, queens):
+        queens = {queen.tag: queen for queen in queens}
+        for tag, (energy, ordered_energy, ordered_loop) in list(self.reserved.items()):
+            queen = queens.get(tag)
+            if queen is None or queen.energy < ordered_energy or \
+                    queen.is_idle and game_loop - ordered_loop > self.RESERVATION_LOOPS:
+                del self.reserved[tag]
+
+    def energy(self, queen):
+        return queen.energy - self.reserved.get(queen.tag, (0,))[0]
+
+    def can_cast(self, queen, energy = 25):
+        return self.energy(queen) >= energy
+
+    def reserve(self, queen, energy, game_loop):
+        reserved = self.reserved.get(queen.tag, (0, queen.energy, game_loop))[0]
+        self.reserved[queen.tag] = (reserved + energy, queen.energy, game_loop)
+
+    def release(self, queen, energy):
+        if queen.tag in self.reserved:
+            reserved, ordered_energy, ordered_loop = self.reserved[queen.tag]
+            if reserved <= energy:
+                del self.reserved[queen.tag]
+            else:
+                self.reserved[queen.tag] = (reserved - energy, ordered_energy, ordered_loop)
+
+    def is_injected(self, hatchery, game_loop):
+        return self.inject_until.get(hatchery.tag, 0) - game_loop > self.inject_lead
+
+    '''
+    Pairs queens with energy and hatcheries whose inject is about to run out, the hatchery whose inject runs out first
+    gets the closest queen. Returns a list of (queen, hatchery), the energy and the inject are already accounted for
+    '''
+    def plan_injects(self, game_loop, queens, hatcheries):
+        self.queries_avoided += len(queens)
+        queens = [queen for queen in queens if self.can_cast(queen, self.INJECT_ENERGY)]
+        hatcheries = sorted((hatchery for hatchery in hatcheries if not self.is_injected(hatchery, game_loop)),
+                            key=lambda hatchery: self.inject_until.get(hatchery.tag, 0))
+        injects = []
+        for hatchery in hatcheries:
+            if not queens:
+                break
+            queen = min(queens, key=lambda queen: queen.distance_to(hatchery))
+            queens.remove(queen)
+            self.start_inject(queen, hatchery, game_loop)
+            injects.append((queen, hatchery))
+        return injects
+
+    def start_inject(self, queen, hatchery, game_loop):
+        self.reserve(queen, self.INJECT_ENERGY, game_loop)
+        self.inject_until[hatchery.tag] = max(self.inject_until.get(hatchery.tag, 0), game_loop) + self.INJECT_LOOPS
+        self.injects += 1
+
+    # For an inject order the game rejected
+    def cancel_inject(self, queen, hatchery):
+        self.release(queen, self.INJECT_ENERGY)
+        self.inject_until[hatchery.tag] -= self.INJECT_LOOPS
+        self.injects -= 1
+
+    def start_tumor(self, queen, game_loop):
+        self.reserve(queen, self.TUMOR_ENERGY, game_loop)
+        self.tumors += 1
+
+    def report(self):
+        return "{} injects, {} creep tumors, {} ability queries avoided".format(self.injects, self.tumors, self.queries_avoided)
+
+
+'''
+Simulates 6 queens on 4 hatcheries: every 8 game loops the tracker orders injects and the queens with energy left over
+place creep tumors. Queens walk to their hatchery and cast when they arrive, a cast without the energy for it fails
+'''
+if __name__ == '__main__':
+    class Point():
+        def __init__(self, x, y):
+            self.x, self.y = x, y
+
+        def distance_to(self, other):
+            return ((self.x - other.x) ** 2 + (self.y - other.y) ** 2) ** .5
+
+    class Hatchery(Point):
+        def __init__(self, tag, x, y):
+            super().__init__(x, y)
+            self.tag = tag
+            self.inject_until = 0  # What the game knows
+            self.injected_loops = 0
+
+    class Queen(Point):
+        def __init__(self, tag, x, y):
+            super().__init__(x, y)
+            self.tag = tag
+            self.energy = 25 + random.random() * 25
+            self.order = None  # (ability, target)
+
+        @property
+        def is_idle(self):
+            return self.order is None
+
+    nLoops, stepLoops, speed = 22.4 * 60 * 10, 8, 1.31 / 22.4
+    random.seed(0)
+    hatcheries = [Hatchery(i, x, y) for i, (x, y) in enumerate([(0, 0), (30, 0), (0, 30), (30, 30)])]
+    queens = [Queen(100 + i, random.random() * 30, random.random() * 30) for i in range(6)]
+    tracker = QueenTracker()
+    failed = commands = 0
+
+    for game_loop in range(int(nLoops)):
+        for hatchery in hatcheries:
+            if hatchery.inject_until > game_loop:
+                hatchery.injected_loops += 1
+        for queen in queens:
+            queen.energy = min(queen.energy + QueenTracker.ENERGY_PER_LOOP, 200)
+            if queen.order is None:
+                continue
+            ability, target = queen.order
+            if queen.distance_to(target) > 3:
+                step = min(speed, queen.distance_to(target) - 3)
+                queen.x += (target.x - queen.x) / queen.distance_to(target) * step
+                queen.y += (target.y - queen.y) / queen.distance_to(target) * step
+                continue
+            queen.order = None
+            if queen.energy < 25:
+                failed += 1
+                continue
+            queen.energy -= 25
+            if ability == "inject":
+                target.inject_until = max(target.inject_until, game_loop) + QueenTracker.INJECT_LOOPS
+
+        if game_loop % stepLoops:
+            continue
+        tracker.update(game_loop, queens)
+        idle = [queen for queen in queens if queen.order is None]
+        for queen, hatchery in tracker.plan_injects(game_loop, idle, hatcheries):
+            queen.order = ("inject", hatchery)
+            commands += 1
+        for queen in idle:
+            # Tumors only from energy that is not needed for the next inject
+            if queen.order is None and tracker.can_cast(queen, QueenTracker.TUMOR_ENERGY + QueenTracker.INJECT_ENERGY):
+                tracker.start_tumor(queen, game_loop)
+                queen.order = ("tumor", Point(queen.x + random.random() * 4, queen.y + random.random() * 4))
+                commands += 1
+
+    uptime = ", ".join("{:0.0%}".format(hatchery.injected_loops / nLoops) for hatchery in hatcheries)
+    print("### {} commands, {} failed, inject uptime per hatchery {}".format(commands, failed, uptime))
+    print("### " + tracker.report())
+    assert failed == 0
@@ -0,0 +1,53 @@
+'''
+Minerals and vespene spent by the commands of the current step
+The basic builds, build orders and defenses each check can_afford against the same totals and then issue commands.
+The ledger starts each step from the observed totals and deducts every command as it is issued, so later can_afford
+checks see what is left and commands the step can no longer pay for are dropped before they reach the game
+'''
+class ResourceLedger():
+    def __init__(self, is_enabled = True):
+        # Setting this to false only counts commands, can_afford then checks the observed totals like BotAI does
+        self.is_enabled = is_enabled
+
+        self.minerals = 0  # Observed at the start of the step
+        self.vespene = 0
+        self.spent_minerals = 0  # Spent by the commands issued this step
+        self.spent_vespene = 0
+
+        # Per game
+        self.commands = 0  # Commands sent to the game
+        self.rejected = 0  # Commands the game returned an error for
+        self.blocked = 0  # Commands dropped because the step could no longer pay for them
+
+    def reset(self, minerals, vespene):
+        self.minerals = minerals
+        self.vespene = vespene
+        self.spent_minerals = 0
+        self.spent_vespene = 0
+
+    @property
+    def remaining_minerals(self):
+        return self.minerals - self.spent_minerals
+
+    @property
+    def remaining_vespene(self):
+        return self.vespene - self.spent_vespene
+
+    def can_afford(self, cost):
+        if not self.is_enabled:
+            return True
+        return cost.minerals <= self.remaining_minerals and cost.vespene <= self.remaining_vespene
+
+    def spend(self, cost):
+        self.spent_minerals += cost.minerals
+        self.spent_vespene += cost.vespene
+
+    # For a command the game rejected
+    def refund(self, cost):
+        self.spent_minerals -= cost.minerals
+        self.spent_vespene -= cost.vespene
+
+    def report(self):
+        return "{} sent, {} rejected by the game ({:0.1%}), {} dropped by the resource ledger{}".format(
+            self.commands, self.rejected, self.rejected / max(self.commands, 1), self.blocked,
+            "" if self.is_enabled else " (disabled)")
@@ -0,0 +1,69 @@
+import json
+import os
+
+'''
+Network hyperparameters used by AgentSelector for the agent and strategy networks
+The values below are the ones the selector has always used, and are the fallback when no
+configuration file has been written by hyperparameter_sweep.py
+'''
+DEFAULT_NETWORK_CONFIG = {"depth": 1, "width": 1, "epochs": 100, "lr": .1}
+
+CONFIG_FILE_NAME = "./models/selector_config.json"
+
+'''
+Converts the opponent race given by game_info.player_races into the name used in model and config files
+Matches the naming used by NeuralNetwork for its weight files
+'''
+def raceName(opponent_race):
+    if opponent_race == 1:
+        return "terran"
+    elif opponent_race == 2:
+        return "zerg"
+    else:
+        return "protoss"
+
+'''
+Widths are written into the weight file names by NeuralNetwork, so a whole width is kept an int: a width of 1.0 would
+look for model_XY11.0 instead of the existing model_XY11 weights
+'''
+def normalizeWidth(width):
+    width = float(width)
+    return int(width) if width.is_integer() else width
+
+'''
+Returns the hyperparameters for one network (model_type is "agent", "strategy" or "fused") against the given race
+Any value missing from the configuration file falls back to DEFAULT_NETWORK_CONFIG
+'''
+def loadNetworkConfig(opponent_race, model_type, fileName = CONFIG_FILE_NAME):
+    networkConfig = dict(DEFAULT_NETWORK_CONFIG)
+    try:
+        with open(fileName) as configFile:
+            config = json.load(configFile)
+        networkConfig.update(config.get(raceName(opponent_race), {}).get(model_type, {}))
+    except FileNotFoundError:
+        pass
+    except (ValueError, AttributeError):
+        print("failed to read selector config, using defaults")
+    networkConfig["width"] = normalizeWidth(networkConfig["width"])
+    return networkConfig
+
+'''
+Writes the hyperparameters for one network against the given race, keeping every other entry in the file
+'''
+def saveNetworkConfig(opponent_race, model_type, networkConfig, fileName = CONFIG_FILE_NAME):
+    config = {}
+    if os.path.exists(fileName):
+        try:
+            with open(fileName) as configFile:
+                config = json.load(configFile)
+        except ValueError:
+            print("failed to read selector config, overwriting it")
+
+    # Make models directory if it doesn't exist
+    directory = os.path.dirname(fileName)
+    if directory and not os.path.exists(directory):
+        os.mkdir(directory)
+
+    config.setdefault(raceName(opponent_race), {})[model_type] = {key: networkConfig[key] for key in DEFAULT_NETWORK_CONFIG}
+    with open(fileName, "w") as configFile:
+        json.dump(config, configFile, indent=4, sort_keys=True)
@@ -0,0 +1,97 @@
+from s2clientprotocol import sc2api_pb2 as sc_pb, raw_pb2 as raw_pb
+
+from sc2.constants import *
+from sc2.data import ActionResult
+from sc2.unit import Unit
+
+
+GAME_LOOPS_PER_MINUTE = 22.4 * 60
+
+
+'''
+Groups commands that share an ability, a target and queueing, keeping the order of their first command
+key reads the command out of each item
+'''
+def group_commands(items, key = lambda command: command):
+    groups = {}
+    for item in items:
+        command = key(item)
+        target = command.target
+        target = ("unit", target.tag) if isinstance(target, Unit) else None if target is None else (target.x, target.y)
+        groups.setdefault((command.ability, target, command.queue), []).append(item)
+    return list(groups.values())
+
+# One raw command for every unit of a group of commands from group_commands
+def raw_command(commands):
+    first = commands[0]
+    command = raw_pb.ActionRawUnitCommand(ability_id=first.ability.value, unit_tags=[command.unit.tag for command in commands],
+                                          queue_command=first.queue)
+    if isinstance(first.target, Unit):
+        command.target_unit_tag = first.target.tag
+    elif first.target is not None:
+        command.target_world_space_pos.x = first.target.x
+        command.target_world_space_pos.y = first.target.y
+    return raw_pb.ActionRaw(unit_command=command)
+
+'''
+Sends raw actions in one RequestAction and returns the result of each, in order
+Client.actions only takes UnitCommand objects and builds the protos itself, so it cannot send a prebuilt multi unit
+ActionRawUnitCommand, and it returns only the errors, which cannot be matched back to the groups. This is the one place
+that calls the client's private _execute for that
+'''
+async def execute_actions(client, actions):
+    response = await client._execute(action=sc_pb.RequestAction(actions=[sc_pb.Action(action_raw=action) for action in actions]))
+    return response.action.result
+
+'''
+Sends each group of commands as one multi unit command, all of them in one request
+Returns the result of each group, None when the game accepted it
+'''
+async def send_commands(client, groups):
+    results = await execute_actions(client, [raw_command(commands) for commands in groups])
+    return [None if result == ActionResult.Success.value else ActionResult(result) for result in results]
+
+
+'''
+Gives the same order to a group of units through LoserAgent.do_group
+The strategies gave every unit of the army its own attack or move every step, even when the unit already had that
+order. The command filter leaves out the units that already follow the order, and the others get one command with
+all of their tags. The report compares the unit commands the strategies asked for with the ones sent
+'''
+class SquadCommands():
+    def __init__(self):
+        # Per game
+        self.unit_orders = 0  # Unit commands the strategies asked for, what was sent before squad orders
+        self.sent = 0  # Unit commands sent and accepted by the game
+        self.first_loop = None
+        self.last_loop = None
+
+    '''
+    Orders every unit of units to use ability on target, a point or a unit
+    Returns the first error or None
+    '''
+    async def issue(self, agent, units, ability, target):
+        game_loop = agent.state.game_loop
+        self.first_loop = game_loop if self.first_loop is None else self.first_loop
+        self.last_loop = game_loop
+
+        commands = [unit(ability, target) for unit in units]
+        if not commands:
+            return None
+        err, sent = await agent.do_group(commands)
+        self.unit_orders += len(commands)
+        self.sent += len(sent)
+        return err
+
+    async def attack(self, agent, units, target):
+        return await self.issue(agent, units, AbilityId.ATTACK, target)
+
+    async def move(self, agent, units, target):
+        return await self.issue(agent, units, AbilityId.MOVE, target)
+
+    def report(self):
+        minutes = 0 if self.first_loop is None else (self.last_loop - self.first_loop) / GAME_LOOPS_PER_MINUTE
+        if minutes == 0:
+            return "{} unit commands asked for, {} sent".format(self.unit_orders, self.sent)
+        return "{:0.1f} unit commands per minute asked for, {:0.1f} sent ({} asked for, {} sent)".format(
+            self.unit_orders / minutes, self.sent / minutes, self.unit_orders, self.sent)
@@ -0,0 +1,165 @@
+import time
+from collections import OrderedDict
+
+
+'''
+Splits the work of one on_step into prioritized tasks that share a time budget, so one expensive step does not make
+the bot miss game loops in realtime games
+Tasks run in the order given until budget seconds of the step are spent, the rest are deferred to a later step.
+A task that has been deferred for maxDeferredLoops game loops runs anyway so low priority work is never starved. The
+limit is in game loops and not steps so it means the same time whatever the game step is, 64 is 8 steps at the
+default game step of 8 loops and 64 steps when each step is one loop
+A task can also be given a period in game loops, it is then skipped until that many game loops have passed since it last ran
+'''
+class StepScheduler():
+    def __init__(self, budget = .03, maxDeferredLoops = 64):
+        self.budget = budget
+        self.maxDeferredLoops = maxDeferredLoops
+        self.tasks = OrderedDict()  # Task name to its metrics, in the order tasks were first seen
+
+    '''
+    Runs tasks, a list of (name, coroutine function, period in game loops) in priority order
+    gameLoop is the current game loop, skipped steps are not counted as deferrals
+    '''
+    async def run(self, tasks, gameLoop):
+        start = time.perf_counter()
+        for name, task, period in tasks:
+            metrics = self.tasks.get(name)
+            if metrics is None:
+                metrics = self.tasks[name] = {"runs": 0, "skips": 0, "deferrals": 0, "deferredSince": None, "lastLoop": None,
+                                              "time": 0, "cpu": 0, "worst": 0}
+
+            if metrics["lastLoop"] is not None and gameLoop - metrics["lastLoop"] < period:
+                metrics["skips"] += 1
+                continue
+
+            deferredSince = metrics["deferredSince"]
+            if time.perf_counter() - start >= self.budget and \
+                    (deferredSince is None or gameLoop - deferredSince < self.maxDeferredLoops):
+                metrics["deferrals"] += 1
+                if deferredSince is None:
+                    metrics["deferredSince"] = gameLoop
+                continue
+
+            taskStart = time.perf_counter()
+            cpuStart = time.process_time()
+            await task()
+            elapsed = time.perf_counter() - taskStart
+            metrics["cpu"] += time.process_time() - cpuStart
+            metrics["runs"] += 1
+            metrics["deferredSince"] = None
+            metrics["lastLoop"] = gameLoop
+            metrics["time"] += elapsed
+            metrics["worst"] = max(metrics["worst"], elapsed)
+
+    def deferrals(self):
+        return {name: metrics["deferrals"] for name, metrics in self.tasks.items()}
+
+    # Seconds of CPU time used by all tasks
+    def cpuTime(self):
+        return sum(metrics["cpu"] for metrics in self.tasks.values())
+
+    def report(self):
+        tasks = ", ".join("{} {} runs {} skipped {} deferred ({:0.0f}ms CPU, worst {:0.1f}ms)".format(
+            name, metrics["runs"], metrics["skips"], metrics["deferrals"], metrics["cpu"] * 1000, metrics["worst"] * 1000)
+            for name, metrics in self.tasks.items())
+        return "{}, {:0.2f}s CPU in total".format(tasks, self.cpuTime())
+
+
+'''
+Stand-in economy for --build-skip: the CPU time of the economy task and the army it builds with K = 1 and K = 8
+Both players mine and make drones, overlords and zerglings from larvae for six minutes. Our economy and micro tasks
+loop over stand-in units like the python-sc2 filters do and run through the scheduler with period K, the opponent's
+economy runs every game loop. The economy task is a stand-in for basic_build, which needs a running game, so its CPU
+time only shows how often the task runs. No fights are played, the effect on the win rate is not measured here
+'''
+if __name__ == '__main__':
+    import asyncio
+    import random
+
+    LOOPS_PER_SECOND = 22.4
+    COSTS = {"drone": (50, 272), "overlord": (100, 400), "zergling": (50, 381)}  # Minerals and game loops to hatch
+    class Player():
+        def __init__(self, mining):
+            self.mining = mining  # Minerals per worker per game loop, it changes with the map
+            self.minerals = 50
+            self.workers = 12
+            self.zerglings = 0
+            self.supply_cap = 14
+            self.larvae = 3
+            self.larva_loop = 0
+            self.hatching = []  # (game loop it hatches on, unit)
+            self.units = [(random.random() * 30, random.random() * 30, random.choice(("drone", "zergling", "overlord")))
+                          for _ in range(60)]
+
+        @property
+        def supply(self):
+            return self.workers + self.zerglings / 2 + sum(1 if unit == "drone" else .5 if unit == "zergling" else 0
+                                                           for _, unit in self.hatching)
+
+        def advance(self, loop):
+            self.minerals += min(self.workers, 16) * self.mining + max(min(self.workers, 24) - 16, 0) * self.mining / 2
+            # Two hatcheries, each queen injects from two minutes on
+            if self.larvae < 6 and loop - self.larva_loop >= 123:
+                self.larvae += 1
+                self.larva_loop = loop
+            if loop >= 2688 and (loop - 2688) % 650 == 0:
+                self.larvae += 6
+            for hatched in [item for item in self.hatching if item[0] <= loop]:
+                self.hatching.remove(hatched)
+                if hatched[1] == "drone":
+                    self.workers += 1
+                elif hatched[1] == "zergling":
+                    self.zerglings += 2
+                else:
+                    self.supply_cap += 8
+
+        def train(self, unit, loop):
+            minerals, loops = COSTS[unit]
+            if self.larvae == 0 or self.minerals < minerals:
+                return False
+            self.minerals -= minerals
+            self.larvae -= 1
+            self.hatching.append((loop + loops, unit))
+            return True
+
+        def economy(self, loop):
+            # The filters and counts of a basic_build, units(DRONE).amount and the like
+            for kind in ("drone", "zergling", "overlord"):
+                sum(1 for unit in self.units if unit[2] == kind)
+            pending_overlords = sum(1 for _, unit in self.hatching if unit == "overlord")
+            if self.supply >= self.supply_cap - 2 - 4 * pending_overlords and pending_overlords < 3:
+                self.train("overlord", loop)
+            elif self.workers < 22 and self.supply < self.supply_cap:
+                self.train("drone", loop)
+            elif self.supply + 1 <= self.supply_cap:
+                self.train("zergling", loop)
+
+        def micro(self):
+            # Distances of the army to a waypoint
+            sum(1 for x, y, kind in self.units if kind == "zergling" and (x - 15) ** 2 + (y - 15) ** 2 < 225)
+
+    async def play(buildSkip, stepLoops, nLoops = int(6 * 60 * LOOPS_PER_SECOND)):
+        scheduler = StepScheduler(budget = 1)
+        mining = random.uniform(.025, .035)
+        us, them = Player(mining), Player(mining)
+        for loop in range(nLoops):
+            us.advance(loop)
+            them.advance(loop)
+            them.economy(loop)
+            if loop % stepLoops == 0:
+                await scheduler.run([("economy", lambda: asyncio.sleep(0, us.economy(loop)), buildSkip),
+                                     ("army micro", lambda: asyncio.sleep(0, us.micro()), 0)], loop)
+        return scheduler.tasks["economy"]["cpu"], us.zerglings, them.zerglings
+
+    nGames = 40
+    loop = asyncio.get_event_loop()
+    for stepLoops in (1, 8):
+        for buildSkip in (1, 8):
+            random.seed(0)
+            results = [loop.run_until_complete(play(buildSkip, stepLoops)) for _ in range(nGames)]
+            cpu = sum(result[0] for result in results) / nGames
+            ours = sum(result[1] for result in results) / nGames
+            theirs = sum(result[2] for result in results) / nGames
+            print("### Game step {} loops, build skip {}: stand-in economy task {:0.1f}ms CPU per game, {:0.1f} zerglings "
+                  "against {:0.1f} at six minutes".format(stepLoops, buildSkip, cpu * 1000, ours, theirs))